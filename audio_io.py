@@ -0,0 +1,165 @@
+import math
+import warnings
+import itertools
+import numpy as np
+import soundfile
+import librosa
+from scipy.io import wavfile
+from scipy.signal import resample_poly
+
+
+def _pcm_to_float(x):
+    """
+    Convert integer PCM samples to float32 in [-1, 1), matching librosa/soundfile scaling.
+    """
+    if x.dtype == np.uint8:
+        return (x.astype(np.float32) - 128.0) / 128.0
+    if np.issubdtype(x.dtype, np.integer):
+        return x.astype(np.float32) / float(2 ** (8 * x.dtype.itemsize - 1))
+    return x.astype(np.float32, copy=False)
+
+
+class AudioReader:
+    """
+    Block-wise, bounded-memory access to an audio file.
+    Uncompressed WAV data is memory-mapped, so only the samples of the current block are
+    paged in; other formats are read in ranges through soundfile. Blocks are downmixed to
+    mono and resampled one at a time with a polyphase filter, using enough context around
+    each block that the concatenated output matches a whole-file resample.
+    `filepath` may also be a file-like object such as a BytesIO holding an uploaded file.
+    """
+
+    def __init__(self, filepath, sr=22050, block_duration=10.0):
+        self.filepath = filepath
+        self._data = None
+        self._whole = None
+
+        if hasattr(filepath, 'read'):
+            # In-memory file (e.g. an upload): decoded once, then resampled like a file on disk
+            self._whole, self.native_sr = soundfile.read(filepath, dtype='float32')
+            self.n_native = len(self._whole)
+        else:
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    self.native_sr, self._data = wavfile.read(filepath, mmap=True)
+                self.n_native = self._data.shape[0]
+            except Exception:
+                try:
+                    info = soundfile.info(filepath)
+                    self.native_sr, self.n_native = info.samplerate, info.frames
+                except Exception:
+                    # Formats libsndfile cannot seek (decoded via audioread): no block access
+                    self._whole, self.native_sr = librosa.load(filepath, sr=None)
+                    self.n_native = len(self._whole)
+
+        self.sr = sr or self.native_sr
+        g = math.gcd(int(self.sr), int(self.native_sr))
+        self._up, self._down = int(self.sr) // g, int(self.native_sr) // g
+
+        # Block and context sizes are multiples of `down`, so block edges map to whole output samples
+        self._block = max(1, int(block_duration * self.native_sr) // self._down) * self._down
+        taps = 10 * max(self._up, self._down) // self._up + 1
+        self._context = math.ceil(taps / self._down) * self._down
+
+        self.n_samples = math.ceil(self.n_native * self._up / self._down)
+        self.duration = self.n_native / self.native_sr
+
+    def _read_native(self, start, stop):
+        start, stop = max(0, start), min(self.n_native, stop)
+        if self._data is not None:
+            x = _pcm_to_float(np.asarray(self._data[start:stop]))
+        elif self._whole is not None:
+            x = self._whole[start:stop]
+        else:
+            x, _ = soundfile.read(self.filepath, start=start, stop=stop, dtype='float32', always_2d=True)
+        if x.ndim > 1: x = x.mean(axis=1)
+        return x
+
+    def _read_block(self, start, stop):
+        if self._up == self._down:
+            return self._read_native(start, stop)
+
+        lo = max(0, start - self._context)
+        x = self._read_native(lo, stop + self._context)
+        y = resample_poly(x, self._up, self._down).astype(np.float32)
+
+        lead = (start - lo) * self._up // self._down
+        n_out = math.ceil((min(stop, self.n_native) - start) * self._up / self._down)
+        return y[lead:lead + n_out]
+
+    def blocks(self):
+        """
+        Yield consecutive mono float32 blocks at the target rate covering the whole file.
+        """
+        for start in range(0, self.n_native, self._block):
+            yield self._read_block(start, start + self._block)
+
+    def read(self):
+        """
+        Decode the whole file into one preallocated array at the target rate.
+        Peak memory is the output array plus a single block.
+        """
+        out = np.empty(self.n_samples, dtype=np.float32)
+        pos = 0
+        for block in self.blocks():
+            out[pos:pos + len(block)] = block
+            pos += len(block)
+        return out[:pos]
+
+    def frames(self, frame_length=2048, hop_length=512, center=True):
+        """
+        Yield analysis frames as (frame_length, n) matrices, one matrix per block.
+        """
+        for segment in frame_segments(self.blocks(), frame_length, hop_length, center):
+            yield librosa.util.frame(segment, frame_length=frame_length, hop_length=hop_length)
+
+
+def resample(y, orig_sr, target_sr):
+    """
+    Polyphase resampling of a whole signal, as AudioReader applies it to every decoded file
+    (the training corpus included), so features of resampled streams match file features.
+    """
+    if orig_sr == target_sr: return np.asarray(y, dtype=np.float32)
+    g = math.gcd(int(orig_sr), int(target_sr))
+    return resample_poly(y, int(target_sr) // g, int(orig_sr) // g).astype(np.float32)
+
+
+def load_audio(filepath, sr=22050):
+    """
+    Drop-in replacement for librosa.load(filepath, sr=sr) backed by AudioReader
+    (a path or a file-like object).
+    """
+    reader = AudioReader(filepath, sr=sr)
+    return reader.read(), reader.sr
+
+
+def slice_blocks(blocks, start, stop):
+    """
+    Restrict a block iterator to samples [start, stop) of the underlying stream.
+    """
+    pos = 0
+    for block in blocks:
+        lo, hi = max(start - pos, 0), min(stop - pos, len(block))
+        if hi > lo: yield block[lo:hi]
+        pos += len(block)
+        if pos >= stop: break
+
+
+def frame_segments(blocks, frame_length, hop_length, center=True):
+    """
+    Re-chunk a block iterator into overlapping segments that each hold a whole number
+    of analysis frames. Framing the segments one after another yields exactly the frames
+    of the full (optionally center-padded) signal, each once.
+    """
+    pad = np.zeros(frame_length // 2 if center else 0, dtype=np.float32)
+    buf = pad
+
+    for block in itertools.chain(blocks, [pad]):
+        buf = np.concatenate([buf, block])
+        if len(buf) < frame_length: continue
+
+        n_frames = 1 + (len(buf) - frame_length) // hop_length
+        yield buf[:(n_frames - 1) * hop_length + frame_length]
+        buf = buf[n_frames * hop_length:]
+
@@ -0,0 +1,105 @@
+"""
+Headless batch classification of recordings.
+
+Usage:
+    python batch_predict.py recordings/ extra.wav -o results.csv [--workers 8] [--batch-size 256]
+                            [--metrics stages.prom]
+
+Inputs may be files or folders (all .wav/.flac/.ogg files under a folder, recursively). Results are
+streamed to CSV or Parquet (by output extension) batch by batch.
+"""
+import argparse
+import os
+import sys
+import time
+from model_engine import ModelEngine
+from data_manager import find_audio_files
+from instrumentation import metrics
+
+
+def collect_inputs(inputs):
+    filepaths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            filepaths.extend(find_audio_files(item))
+        else:
+            filepaths.append(item)
+    return filepaths
+
+
+class ResultWriter:
+    """
+    Appends prediction batches to a CSV or Parquet file.
+    Parquet output requires pyarrow.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.is_parquet = path.lower().endswith('.parquet')
+        self._parquet_writer = None
+        self._wrote_header = False
+
+    def write(self, df):
+        if self.is_parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table.cast(self._parquet_writer.schema))
+        else:
+            df.to_csv(self.path, mode='a' if self._wrote_header else 'w', header=not self._wrote_header, index=False)
+            self._wrote_header = True
+
+    def close(self):
+        if self._parquet_writer is not None: self._parquet_writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bio-Acoustic Translator batch classifier")
+    parser.add_argument('inputs', nargs='+', help="audio files or folders of recordings")
+    parser.add_argument('-o', '--output', default="predictions.csv", help="output .csv or .parquet file")
+    parser.add_argument('--workers', type=int, default=None, help="decode/feature processes (default: all cores)")
+    parser.add_argument('--batch-size', type=int, default=256, help="files per classifier call")
+    parser.add_argument('--data', default="SoundsDatabase", help="training database folder")
+    parser.add_argument('--metrics', default=None,
+                        help="record per-stage timings/failure counts to this .json or .prom file")
+    args = parser.parse_args()
+    if args.metrics: metrics.enable()
+
+    filepaths = collect_inputs(args.inputs)
+    if not filepaths:
+        print("[Batch] No input files found.")
+        return 1
+
+    engine = ModelEngine(args.data, n_workers=args.workers)
+    engine.initialize_system()
+    if not engine.is_trained:
+        print(f"[Batch] {engine.load_error or 'Model is not trained and no training data was found.'}")
+        return 1
+
+    print(f"[Batch] Classifying {len(filepaths)} files -> {args.output}")
+    writer = ResultWriter(args.output)
+    start = time.perf_counter()
+    done = failed = 0
+    try:
+        for df in engine.iter_predictions(filepaths, n_workers=args.workers, batch_size=args.batch_size):
+            writer.write(df)
+            done += len(df)
+            failed += int((df['Error'] != '').sum())
+            elapsed = time.perf_counter() - start
+            print(f"Progress: {done}/{len(filepaths)} | {done / elapsed:.1f} files/s | Failed: {failed}")
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"[Complete] {done} files in {elapsed:.1f}s ({done / max(elapsed, 1e-9):.1f} files/s), "
+          f"{failed} without prediction.")
+    if args.metrics:
+        print(metrics.report())
+        metrics.write(args.metrics)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
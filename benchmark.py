@@ -0,0 +1,620 @@
+"""
+Performance benchmarks for the Bio-Acoustic Translator pipeline.
+
+Usage:
+    python benchmark.py features [--clips 50] [--duration 2.0]
+    python benchmark.py classifiers [--rows 5000] [--data SoundsDatabase]
+    python benchmark.py augmentation [--variants 8] [--duration 2.0]
+    python benchmark.py f0 [--clips 40] [--duration 1.5]
+    python benchmark.py plotting [--duration 60] [--repeats 5]
+    python benchmark.py pipeline [--files 200] [--corpus folder] [--json out.json] [--compare baseline.json]
+    python benchmark.py startup [--repeats 5] [--modules gui_app model_engine ...]
+    python benchmark.py similarity [--rows 1000000] [--queries 200] [--k 20]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import joblib
+import numpy as np
+import pandas as pd
+import librosa
+from dsp_core import DSPCore
+from synthetic_corpus import SPECIES, CONTEXTS, EMOTIONS, SPECIES_F0, synthetic_call, write_corpus
+
+
+def legacy_extract_features(y, sr):
+    """
+    Reference multi-pass extractor (one librosa call, and one STFT, per feature).
+    Used to check the single-STFT engine in DSPCore for speed and agreement.
+    """
+    y_trimmed, _ = librosa.effects.trim(y, top_db=20)
+    if len(y_trimmed) < sr * 0.05: return None
+
+    cent = librosa.feature.spectral_centroid(y=y_trimmed, sr=sr)
+    bw = librosa.feature.spectral_bandwidth(y=y_trimmed, sr=sr)
+    zcr = librosa.feature.zero_crossing_rate(y_trimmed)
+    f0_series = librosa.yin(y_trimmed, fmin=50, fmax=2000, sr=sr)
+    f0_series = f0_series[f0_series > 50]
+
+    features = {
+        'f0_mean': float(np.mean(f0_series)) if len(f0_series) > 0 else 0.0,
+        'centroid_mean': np.mean(cent),
+        'bandwidth_mean': np.mean(bw),
+        'zcr_mean': np.mean(zcr),
+        'duration': librosa.get_duration(y=y_trimmed, sr=sr)
+    }
+    mfcc = librosa.feature.mfcc(y=y_trimmed, sr=sr, n_mfcc=13)
+    for i in range(13): features[f'mfcc_{i + 1}'] = np.mean(mfcc[i])
+    return features
+
+
+def _time_per_call(fn, items):
+    start = time.perf_counter()
+    results = [fn(item) for item in items]
+    return (time.perf_counter() - start) / max(1, len(items)), results
+
+
+def bench_features(n_clips=50, duration=2.0, seed=0):
+    """
+    Compare per-clip latency of DSPCore.extract_features against the legacy
+    multi-pass extractor, and report the largest deviation per feature.
+    """
+    dsp = DSPCore()
+    rng = np.random.default_rng(seed)
+    clips = [synthetic_call(dsp.sr, duration, rng.uniform(80, 800), rng) for _ in range(n_clips)]
+
+    # Warm up caches (mel filterbank, FFT plans, numba JIT inside librosa)
+    dsp.extract_features(clips[0])
+    legacy_extract_features(clips[0], dsp.sr)
+
+    t_legacy, ref = _time_per_call(lambda y: legacy_extract_features(y, dsp.sr), clips)
+    t_new, new = _time_per_call(dsp.extract_features, clips)
+
+    print(f"[Benchmark] extract_features on {n_clips} clips of {duration:.1f}s @ {dsp.sr} Hz")
+    print(f"  legacy multi-pass : {t_legacy * 1000:8.2f} ms/clip")
+    print(f"  single-STFT       : {t_new * 1000:8.2f} ms/clip")
+    print(f"  speedup           : {t_legacy / t_new:8.2f}x")
+
+    print("  max relative deviation per feature:")
+    for key in ref[0]:
+        a = np.array([r[key] for r in ref], dtype=float)
+        b = np.array([r[key] for r in new], dtype=float)
+        dev = np.max(np.abs(a - b) / np.maximum(np.abs(a), 1e-9))
+        print(f"    {key:<15} {dev:.2e}")
+
+    return {'legacy_ms': t_legacy * 1000, 'new_ms': t_new * 1000, 'speedup': t_legacy / t_new}
+
+
+def synthetic_feature_table(n_rows=5000, seed=0):
+    """
+    Labelled feature table with label-dependent offsets, shaped like scan_folder output.
+    """
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((n_rows, len(DSPCore.FEATURE_NAMES)))
+    df = pd.DataFrame(X, columns=DSPCore.FEATURE_NAMES)
+
+    for col, values in (('Species', SPECIES), ('Context', CONTEXTS), ('Emotion', EMOTIONS)):
+        codes = rng.integers(len(values), size=n_rows)
+        offsets = rng.normal(0, 0.8, (len(values), X.shape[1]))
+        df[DSPCore.FEATURE_NAMES] += offsets[codes]
+        df[col] = np.array(values, dtype=object)[codes]
+    return df
+
+
+def bench_classifiers(df=None, n_rows=5000, seed=0):
+    """
+    Compare the three separate forests with the fused multi-output forest:
+    fit time, single-row and batch predict latency, checkpoint size and accuracy.
+    """
+    from sklearn.model_selection import train_test_split
+    from model_engine import ModelEngine, LABEL_COLS
+
+    if df is None: df = synthetic_feature_table(n_rows, seed)
+    feature_cols = [c for c in DSPCore.FEATURE_NAMES if c in df.columns]
+    train, test = train_test_split(df, test_size=0.2, random_state=seed)
+
+    print(f"[Benchmark] classifiers on {len(train)} train / {len(test)} test rows")
+    print(f"  {'model':<9} {'fit s':>7} {'1-row ms':>9} {'batch ms':>9} {'size MB':>8}  accuracy "
+          f"(species/context/emotion/all)")
+
+    results = {}
+    for model_type in ("separate", "fused"):
+        engine = ModelEngine(model_type=model_type)
+        engine.feature_cols = feature_cols
+
+        start = time.perf_counter()
+        engine.fit_classifiers(train[feature_cols], train)
+        fit_s = time.perf_counter() - start
+
+        rows = [test.iloc[[i]] for i in range(min(50, len(test)))]
+        single_ms, _ = _time_per_call(engine.classify_features, rows)
+        start = time.perf_counter()
+        preds = engine.classify_features(test)
+        batch_ms = (time.perf_counter() - start) * 1000
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ckpt.pkl")
+            joblib.dump(engine.classifiers(), path)
+            size_mb = os.path.getsize(path) / 1e6
+
+        hits = np.column_stack([np.asarray(p) == test[col].values for p, col in zip(preds, LABEL_COLS)])
+        acc = list(hits.mean(axis=0)) + [hits.all(axis=1).mean()]
+
+        results[model_type] = {'fit_s': fit_s, 'predict_1row_ms': single_ms * 1000, 'predict_batch_ms': batch_ms,
+                               'checkpoint_mb': size_mb, 'accuracy': acc}
+        print(f"  {model_type:<9} {fit_s:7.2f} {single_ms * 1000:9.2f} {batch_ms:9.1f} {size_mb:8.1f}  "
+              + " / ".join(f"{a:.3f}" for a in acc))
+
+    return results
+
+
+def legacy_variate(y, sr, n_steps, rate):
+    """
+    Reference augmentation chain: pitch_shift (stretch + resample), then a second time_stretch.
+    Without noise, fades and normalization: compare with augment_batch(..., finish=False).
+    """
+    y_shifted = librosa.effects.pitch_shift(y, sr=sr, n_steps=n_steps)
+    return librosa.effects.time_stretch(y_shifted, rate=rate)
+
+
+def spectral_distance(a, b, sr):
+    """
+    Mean absolute log-mel difference in dB between two peak-normalized signals.
+    """
+    n = min(len(a), len(b))
+    mels = [librosa.power_to_db(librosa.feature.melspectrogram(y=x[:n] / max(np.max(np.abs(x[:n])), 1e-9), sr=sr),
+                                ref=1.0, top_db=None) for x in (a, b)]
+    mels = [np.maximum(m, -80.0) for m in mels]
+    return float(np.mean(np.abs(mels[0] - mels[1])))
+
+
+def bench_augmentation(n_variants=8, duration=2.0, seed=0):
+    """
+    Compare DSPCore.augment_batch (one shared STFT, one vocoder pass, one resample) against the
+    legacy pitch_shift + time_stretch chain for the same random parameters: time per variant
+    (augment_batch including noise, fades and normalization), plus the log-mel spectral distance
+    between the legacy chain and the bare pitch/time transform (finish=False), so neither side
+    carries random noise. The distance between two legacy variants with different parameters is
+    printed as the scale of intended variation.
+    """
+    dsp = DSPCore()
+    rng = np.random.default_rng(seed)
+    y = synthetic_call(dsp.sr, duration, 220.0, rng)
+    n_steps = rng.uniform(-0.1, 0.1, n_variants)
+    rates = rng.uniform(0.98, 1.02, n_variants)
+
+    legacy_variate(y, dsp.sr, n_steps[0], rates[0])
+    dsp.augment_batch(y, 1)
+
+    start = time.perf_counter()
+    legacy = [legacy_variate(y, dsp.sr, s, r) for s, r in zip(n_steps, rates)]
+    t_legacy = (time.perf_counter() - start) / n_variants
+
+    start = time.perf_counter()
+    variants, lengths = dsp.augment_batch(y, n_variants, n_steps, rates)
+    t_new = (time.perf_counter() - start) / n_variants
+
+    t_single = _time_per_call(lambda _: dsp.augment_batch(y, 1, n_steps[:1], rates[:1]), range(n_variants))[0]
+
+    variants, lengths = dsp.augment_batch(y, n_variants, n_steps, rates, finish=False)
+    dist = [spectral_distance(legacy[k], variants[k, :lengths[k]], dsp.sr) for k in range(n_variants)]
+    spread = [spectral_distance(legacy[k], legacy[(k + 1) % n_variants], dsp.sr) for k in range(n_variants)]
+
+    print(f"[Benchmark] augmentation, {n_variants} variants of a {duration:.1f}s template")
+    print(f"  legacy chain       : {t_legacy * 1000:8.2f} ms/variant")
+    print(f"  one-shot (single)  : {t_single * 1000:8.2f} ms/variant")
+    print(f"  one-shot (batched) : {t_new * 1000:8.2f} ms/variant")
+    print(f"  speedup (batched)  : {t_legacy / t_new:8.2f}x")
+    print(f"  log-mel distance new vs legacy   : {np.mean(dist):.2f} dB (max {np.max(dist):.2f})")
+    print(f"  log-mel distance between variants: {np.mean(spread):.2f} dB")
+
+    return {'legacy_ms': t_legacy * 1000, 'single_ms': t_single * 1000, 'batched_ms': t_new * 1000,
+            'distance_db': float(np.mean(dist)), 'variant_spread_db': float(np.mean(spread))}
+
+
+# Minimum share of voiced frames (%) on which a backend must be within 5% of librosa.yin
+F0_FRAME_AGREEMENT_BOUND = 90.0
+
+
+def _frame_agreement(dsp, clips, sr):
+    """
+    Percentage of voiced frames (gate passed, both estimates voiced) on which the backend's
+    per-frame F0 is within 5% of librosa.yin over the same range, across all clips.
+    """
+    fmin, fmax = dsp.f0_range
+    agree = total = 0
+    for y in clips:
+        y, _ = librosa.effects.trim(y, top_db=20)
+        frames = dsp._frame_signal(y)
+        _, _, zcr, _, S = dsp._frame_features(frames, sr)
+        f0 = dsp._frame_f0(y, frames, zcr, S, sr)
+        ref = librosa.yin(y, fmin=fmin, fmax=fmax, sr=sr)
+        voiced = dsp._voiced_frames(frames, zcr) & (f0 > 0) & (ref > fmin)
+        agree += np.sum(np.abs(f0[voiced] - ref[voiced]) <= 0.05 * ref[voiced])
+        total += np.sum(voiced)
+    return 100.0 * agree / max(total, 1)
+
+
+def bench_f0(n_clips=40, duration=1.5, seed=0):
+    """
+    Compare the F0 backends (and the species-aware F0 range) on synthetic calls with a known
+    F0: extract_features time per clip, agreement of f0_mean with the default YIN
+    configuration, per-frame agreement with librosa.yin on voiced frames (checked against
+    F0_FRAME_AGREEMENT_BOUND) and the error against the true F0.
+    """
+    rng = np.random.default_rng(seed)
+    sr = 22050
+    truth = np.array([SPECIES_F0[SPECIES[k % len(SPECIES)]] * rng.uniform(0.8, 1.25) for k in range(n_clips)])
+    clips = [synthetic_call(sr, duration, f0, rng) for f0 in truth]
+
+    species_range = DSPCore.species_f0_range(SPECIES)
+    configs = [(backend, None) for backend in DSPCore.F0_BACKENDS] + \
+              [(backend, species_range) for backend in DSPCore.F0_BACKENDS]
+
+    print(f"[Benchmark] F0 backends, {n_clips} clips of {duration:.1f}s (species range {species_range})")
+    print(f"  {'backend':<10}{'range':<16}{'ms/clip':>9}{'speedup':>9}{'vs yin %':>10}{'within 5%':>11}"
+          f"{'frames ok':>11}{'vs true %':>11}")
+    reference, t_reference, results = None, None, {}
+    for backend, f0_range in configs:
+        dsp = DSPCore(sr, f0_backend=backend, f0_range=f0_range)
+        dsp.extract_features(clips[0], sr)
+        t, feats = _time_per_call(lambda y: dsp.extract_features(y, sr), clips)
+        f0 = np.array([f['f0_mean'] if f else 0.0 for f in feats])
+        if reference is None: reference, t_reference = f0, t
+
+        agree = np.abs(f0 - reference) / np.maximum(reference, 1e-9) * 100
+        error = np.abs(f0 - truth) / truth * 100
+        frames_ok = _frame_agreement(dsp, clips, sr)
+        label = f"{dsp.f0_range[0]:g}-{dsp.f0_range[1]:g} Hz"
+        print(f"  {backend:<10}{label:<16}{t * 1000:9.2f}{t_reference / t:8.2f}x{np.median(agree):10.2f}"
+              f"{np.mean(agree <= 5) * 100:10.0f}%{frames_ok:10.1f}%{np.median(error):11.2f}"
+              f"{'  <- below bound' if frames_ok < F0_FRAME_AGREEMENT_BOUND else ''}")
+        results[f"{backend}@{label}"] = {'ms_per_clip': t * 1000, 'median_diff_vs_yin_pct': float(np.median(agree)),
+                                         'frame_agreement_pct': float(frames_ok),
+                                         'median_error_pct': float(np.median(error))}
+    return results
+
+
+def bench_plotting(duration=60.0, repeats=5, seed=0):
+    """
+    Time one waveform + spectrum redraw of a long clip (Agg canvas at GUI size): the legacy
+    path (every sample plotted, full-length FFT) against SignalView (min/max envelope at
+    pixel width, capped and decimated Welch spectrum limited to 4 kHz, line artists blitted
+    over a cached background), for a new clip and for re-showing the same clip (cached
+    spectrum). The full draw SignalView does on its first show or a resize is timed apart.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from plot_utils import SignalView
+
+    sr = 22050
+    rng = np.random.default_rng(seed)
+    y = synthetic_call(sr, duration, 220.0, rng)
+
+    def new_figure():
+        fig = Figure(figsize=(5, 4), dpi=100)
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.subplots(2, 1)
+        return canvas, ax
+
+    canvas, ax = new_figure()
+
+    def legacy_redraw():
+        ax[0].clear()
+        ax[0].plot(np.linspace(0, len(y) / sr, len(y)), y, lw=0.8)
+        ax[1].clear()
+        ax[1].plot(np.fft.rfftfreq(len(y), 1 / sr), np.abs(np.fft.rfft(y)), lw=0.8)
+        ax[1].set_xlim(0, 4000)
+        canvas.draw()
+
+    new_canvas, new_ax = new_figure()
+    view = SignalView(new_canvas, new_ax[0], new_ax[1], "C0", "gray")
+
+    def new_redraw(clip):
+        view.show(clip, sr, "Waveform", "Frequency Spectrum (Welch)")
+
+    # The first show sets the titles and time axis: one full draw that caches the background
+    t_full = _time_per_call(new_redraw, [y.copy()])[0]
+    t_legacy = _time_per_call(lambda _: legacy_redraw(), range(repeats))[0]
+    # A copy per call is a new signal to SignalView, so its spectrum is recomputed
+    t_new = _time_per_call(new_redraw, [y.copy() for _ in range(repeats)])[0]
+    t_cached = _time_per_call(new_redraw, [y] * repeats)[0]
+
+    print(f"[Benchmark] plotting, {duration:.0f}s clip ({len(y)} samples), {repeats} redraws")
+    print(f"  legacy (all samples, full FFT) : {t_legacy * 1000:8.1f} ms/redraw")
+    print(f"  first show (full draw)         : {t_full * 1000:8.1f} ms")
+    print(f"  decimated + Welch, new clip    : {t_new * 1000:8.1f} ms/redraw ({t_legacy / t_new:.2f}x)")
+    print(f"  same clip (cached spectrum)    : {t_cached * 1000:8.1f} ms/redraw ({t_legacy / t_cached:.2f}x)")
+    return {'legacy_ms': t_legacy * 1000, 'full_ms': t_full * 1000, 'new_ms': t_new * 1000,
+            'cached_ms': t_cached * 1000}
+
+
+def bench_similarity(n_rows=1000000, n_queries=200, k=20, seed=0):
+    """
+    Build time, per-query latency and recall@k of the IVF SimilarityIndex against its
+    exact scan, on a synthetic feature table (label-dependent clusters).
+    """
+    from similarity_index import SimilarityIndex
+
+    df = synthetic_feature_table(n_rows, seed)
+    X = df[DSPCore.FEATURE_NAMES].to_numpy(dtype=np.float32)
+    paths = np.arange(n_rows).astype(str)
+    del df
+
+    start = time.perf_counter()
+    index = SimilarityIndex().build(X, paths, seed=seed)
+    t_build = time.perf_counter() - start
+
+    rng = np.random.default_rng(seed + 1)
+    queries = X[rng.integers(n_rows, size=n_queries)] + rng.normal(0, 0.1, (n_queries, X.shape[1])).astype(np.float32)
+    t_ivf, approx = _time_per_call(lambda q: index.search(q, k=k), queries)
+    t_exact, exact = _time_per_call(lambda q: index.search(q, k=k, exact=True), queries)
+    recall = np.mean([len({p for p, _ in a} & {p for p, _ in e}) / k for a, e in zip(approx, exact)])
+
+    print(f"[Benchmark] similarity, {n_rows} rows x {X.shape[1]} features, {index.n_lists} cells, "
+          f"n_probe={index.n_probe}, {n_queries} queries")
+    print(f"  build          : {t_build:8.2f} s")
+    print(f"  exact scan     : {t_exact * 1000:8.2f} ms/query")
+    print(f"  IVF            : {t_ivf * 1000:8.2f} ms/query")
+    print(f"  speedup        : {t_exact / t_ivf:8.2f}x")
+    print(f"  recall@{k:<7}: {recall:8.3f}")
+    return {'build_s': t_build, 'exact_ms': t_exact * 1000, 'ivf_ms': t_ivf * 1000, 'recall': recall}
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process and of its (finished) worker processes, in MiB.
+    None where the resource module is unavailable (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_pipeline(n_files=200, corpus=None, n_workers=None, n_sample=30, seed=0):
+    """
+    Time every stage of the pipeline on a synthetic corpus (written to a temporary folder
+    unless an existing `corpus` folder is given): decode, extract_features, scan_folder,
+    classifier fit, checkpoint save/load, predict_audio and variate_sample.
+    Per-file stages run on the first `n_sample` files, after one untimed warm-up call (the
+    first call pays for librosa/numba JIT compilation). With several workers, starting and
+    warming the scan's process pool is reported as its own `pool_startup` stage.
+    Returns a JSON-serializable dict.
+    """
+    from audio_io import load_audio
+    from data_manager import DataManager, find_audio_files
+    from checkpoint import save_checkpoint
+    from feature_store import FeatureStore
+    from model_engine import ModelEngine, LABEL_COLS
+
+    workdir = tempfile.mkdtemp(prefix="bio_bench_")
+    folder = corpus or os.path.join(workdir, "corpus")
+    # Same discovery as scan_folder (recursive, every supported format), so a corpus that
+    # already holds audio is only ever read, never written into
+    paths = find_audio_files(folder) if os.path.isdir(folder) else []
+    if not paths:
+        print(f"[Benchmark] Writing {n_files} synthetic files to {folder}...")
+        write_corpus(folder, n_files, seed=seed)
+        paths = find_audio_files(folder)
+    sample = paths[:n_sample]
+    stages = {}
+
+    def timed(name, fn, n_items=1):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        stages[name] = {'seconds': elapsed, 'items': n_items, 'ms_per_item': elapsed * 1000 / max(1, n_items),
+                        'items_per_s': n_items / max(elapsed, 1e-9)}
+        print(f"  {name:<18}: {elapsed:8.3f} s  ({stages[name]['items_per_s']:8.1f} items/s)")
+        return result
+
+    dsp = DSPCore()
+    data_mgr = DataManager(folder, n_workers=n_workers)
+    n_pool = min(data_mgr._resolve_workers(n_workers), len(paths))
+    try:
+        print(f"[Benchmark] pipeline, {len(paths)} files ({len(sample)} for per-file stages)")
+        dsp.extract_features(load_audio(sample[0], sr=dsp.sr)[0], dsp.sr)
+        signals = timed('decode', lambda: [load_audio(p, sr=dsp.sr)[0] for p in sample], len(sample))
+        timed('extract_features', lambda: [dsp.extract_features(y, dsp.sr) for y in signals], len(sample))
+
+        if n_pool > 1:
+            # One file per worker: process start-up, imports and JIT, kept out of scan_folder
+            data_mgr.executor = ProcessPoolExecutor(max_workers=n_pool)
+            timed('pool_startup', lambda: list(data_mgr.featurize_files(paths[:n_pool], dsp, chunksize=1)), n_pool)
+        df = timed('scan_folder', lambda: data_mgr.scan_folder(dsp), len(paths))
+
+        store = FeatureStore(os.path.join(workdir, "feature_store"))
+        timed('feature_store_write', lambda: store.write(df, dsp.FEATURE_NAMES, dsp.feature_version), len(df))
+        timed('feature_store_load', lambda: FeatureStore(store.folder).load(dsp.feature_version).to_frame(), len(df))
+
+        engine = ModelEngine(folder, n_workers=n_workers)
+        engine.checkpoint_dir = os.path.join(workdir, "checkpoint")
+        engine.feature_cols = list(DSPCore.FEATURE_NAMES)
+        timed('fit', lambda: engine.fit_classifiers(df[engine.feature_cols].fillna(0), df[LABEL_COLS]), len(df))
+        engine.is_trained = True
+
+        meta = {'feature_version': dsp.feature_version, 'model_type': engine.model_type,
+                'feature_cols': engine.feature_cols, 'template_db': []}
+        timed('checkpoint_save', lambda: save_checkpoint(engine.checkpoint_dir, engine.classifiers(), meta))
+
+        loaded = ModelEngine(folder, n_workers=n_workers)
+        loaded.checkpoint_dir = engine.checkpoint_dir
+
+        def load_checkpoint_models():
+            loaded._load_checkpoint()
+            loaded.load_models()
+        timed('checkpoint_load', load_checkpoint_models)
+
+        loaded.predict_audio(sample[0])
+        timed('predict_audio', lambda: [loaded.predict_audio(p) for p in sample], len(sample))
+        dsp.variate_sample(sample[0])
+        timed('variate_sample', lambda: [dsp.variate_sample(p) for p in sample], len(sample))
+    finally:
+        if data_mgr.executor is not None: data_mgr.executor.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    rss_self, rss_children = peak_rss_mb()
+    if rss_self is not None:
+        print(f"  peak RSS          : {rss_self:8.1f} MiB (workers {rss_children:.1f} MiB)")
+
+    return {'benchmark': 'pipeline', 'commit': _git_commit(), 'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'files': len(paths), 'sample': len(sample), 'workers': n_workers,
+            'peak_rss_mb': rss_self, 'peak_rss_workers_mb': rss_children, 'stages': stages}
+
+
+# Modules whose import cost the startup benchmark tracks
+STARTUP_MODULES = ['gui_app', 'dsp_core', 'data_manager', 'model_engine', 'server']
+HEAVY_MODULES = ['numpy', 'scipy', 'pandas', 'librosa', 'numba', 'sklearn', 'joblib',
+                 'matplotlib', 'sounddevice', 'tkinter']
+GUI_MODULES = {'matplotlib', 'sounddevice', 'tkinter'}
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def bench_startup(modules=None, repeats=5):
+    """
+    Cold import time of each entry-point module, measured in fresh interpreters (median of
+    `repeats` runs), and which heavy packages the import pulls in. Headless modules that load
+    GUI packages are flagged.
+    """
+    modules = modules or STARTUP_MODULES
+    results = {}
+    print(f"[Benchmark] startup, median of {repeats} fresh interpreters")
+    for module in modules:
+        runs, error = [], None
+        for _ in range(repeats):
+            proc = subprocess.run([sys.executable, '-c', _IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                                  capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+            if proc.returncode != 0:
+                error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"
+                break
+            runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+        if error:
+            print(f"  {module:<16}: import failed ({error})")
+            results[module] = {'error': error}
+            continue
+
+        seconds = float(np.median([run['seconds'] for run in runs]))
+        loaded = runs[-1]['loaded']
+        gui = sorted(GUI_MODULES & set(loaded)) if module != 'gui_app' else []
+        print(f"  {module:<16}: {seconds * 1000:8.1f} ms  loads [{', '.join(loaded)}]"
+              f"{'  <- GUI imports: ' + ', '.join(gui) if gui else ''}")
+        results[module] = {'import_ms': seconds * 1000, 'loaded': loaded}
+    return results
+
+
+def compare_results(current, baseline):
+    """
+    Print per-stage time ratios of two pipeline results (>1.00x means slower than baseline).
+    """
+    print(f"[Benchmark] {current.get('commit')} vs baseline {baseline.get('commit')}")
+    for name, stage in current['stages'].items():
+        base = baseline.get('stages', {}).get(name)
+        if not base: continue
+        ratio = stage['ms_per_item'] / max(base['ms_per_item'], 1e-9)
+        print(f"  {name:<18}: {base['ms_per_item']:9.2f} -> {stage['ms_per_item']:9.2f} ms/item  ({ratio:5.2f}x)")
+    if current.get('peak_rss_mb') and baseline.get('peak_rss_mb'):
+        print(f"  {'peak RSS':<18}: {baseline['peak_rss_mb']:9.1f} -> {current['peak_rss_mb']:9.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bio-Acoustic Translator benchmarks")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('features', help="single-STFT vs legacy feature extraction")
+    p.add_argument('--clips', type=int, default=50)
+    p.add_argument('--duration', type=float, default=2.0)
+
+    p = sub.add_parser('classifiers', help="separate forests vs fused multi-output forest")
+    p.add_argument('--rows', type=int, default=5000, help="synthetic rows when --data is not given")
+    p.add_argument('--data', default=None, help="audio database folder to scan for real features")
+
+    p = sub.add_parser('augmentation', help="one-shot augmentation vs pitch_shift + time_stretch")
+    p.add_argument('--variants', type=int, default=8)
+    p.add_argument('--duration', type=float, default=2.0)
+
+    p = sub.add_parser('f0', help="F0 backends: speed vs agreement with default YIN")
+    p.add_argument('--clips', type=int, default=40)
+    p.add_argument('--duration', type=float, default=1.5)
+
+    p = sub.add_parser('plotting', help="decimated waveform/Welch spectrum vs full-resolution redraw")
+    p.add_argument('--duration', type=float, default=60.0)
+    p.add_argument('--repeats', type=int, default=5)
+
+    p = sub.add_parser('pipeline', help="time every pipeline stage on a synthetic corpus")
+    p.add_argument('--files', type=int, default=200, help="synthetic corpus size")
+    p.add_argument('--corpus', default=None, help="existing (or to be written) corpus folder")
+    p.add_argument('--workers', type=int, default=None)
+    p.add_argument('--sample', type=int, default=30, help="files used by the per-file stages")
+    p.add_argument('--json', default=None, help="write results to this JSON file")
+    p.add_argument('--compare', default=None, help="baseline JSON file to compare against")
+
+    p = sub.add_parser('startup', help="cold import time of the entry-point modules")
+    p.add_argument('--repeats', type=int, default=5)
+    p.add_argument('--modules', nargs='+', default=None, help=f"default: {' '.join(STARTUP_MODULES)}")
+
+    p = sub.add_parser('similarity', help="IVF similarity index vs exact nearest-neighbour scan")
+    p.add_argument('--rows', type=int, default=1000000)
+    p.add_argument('--queries', type=int, default=200)
+    p.add_argument('--k', type=int, default=20)
+
+    args = parser.parse_args()
+    if args.command == 'features':
+        bench_features(args.clips, args.duration)
+    elif args.command == 'classifiers':
+        df = None
+        if args.data:
+            from data_manager import DataManager
+            from feature_cache import FeatureCache
+            cache = FeatureCache("feature_cache.pkl", DSPCore.FEATURE_VERSION).load()
+            df = DataManager(args.data, n_workers=None).scan_folder(DSPCore(), cache=cache)
+            cache.save()
+        bench_classifiers(df, args.rows)
+    elif args.command == 'augmentation':
+        bench_augmentation(args.variants, args.duration)
+    elif args.command == 'f0':
+        bench_f0(args.clips, args.duration)
+    elif args.command == 'plotting':
+        bench_plotting(args.duration, args.repeats)
+    elif args.command == 'pipeline':
+        results = bench_pipeline(args.files, args.corpus, args.workers, args.sample)
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+        if args.compare:
+            with open(args.compare, encoding='utf-8') as f:
+                compare_results(results, json.load(f))
+    elif args.command == 'startup':
+        bench_startup(args.modules, args.repeats)
+    elif args.command == 'similarity':
+        bench_similarity(args.rows, args.queries, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+import joblib
+from importlib import metadata
+
+# Bump whenever the checkpoint layout or manifest fields change
+CHECKPOINT_SCHEMA_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+
+def sklearn_version():
+    # Read from the package metadata, so validating a checkpoint does not import sklearn
+    try:
+        return metadata.version('scikit-learn')
+    except metadata.PackageNotFoundError:
+        return None
+
+
+class CheckpointError(Exception):
+    """
+    Raised when a checkpoint is missing, corrupted or incompatible with this build.
+    """
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class LazyModel:
+    """
+    Stand-in for a checkpointed estimator that is only read from disk on first use.
+    The file is checksum-verified and loaded with joblib memory-mapping; attribute
+    access (e.g. .predict) is forwarded to the loaded estimator.
+    """
+
+    def __init__(self, path, sha256=None, mmap_mode='r'):
+        self.path = path
+        self.sha256 = sha256
+        self.mmap_mode = mmap_mode
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self):
+        return self._model is not None
+
+    def load(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    if self.sha256 and file_sha256(self.path) != self.sha256:
+                        raise CheckpointError(f"Checksum mismatch for {self.path}; the checkpoint is corrupted.")
+                    self._model = joblib.load(self.path, mmap_mode=self.mmap_mode)
+        return self._model
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
+
+def save_checkpoint(folder, models, meta):
+    """
+    Write each model to its own uncompressed (memory-mappable) joblib file and a manifest
+    with schema/feature versions and checksums. The checkpoint is assembled in a
+    temporary folder first, so an interrupted save never leaves a half-written one.
+    """
+    tmp_folder = folder + ".tmp"
+    shutil.rmtree(tmp_folder, ignore_errors=True)
+    os.makedirs(tmp_folder)
+
+    files = {}
+    for name, model in models.items():
+        filename = f"{name}.joblib"
+        path = os.path.join(tmp_folder, filename)
+        joblib.dump(model, path)
+        files[name] = {'file': filename, 'sha256': file_sha256(path), 'bytes': os.path.getsize(path)}
+
+    manifest = {
+        'schema_version': CHECKPOINT_SCHEMA_VERSION,
+        'sklearn_version': sklearn_version(),
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        **meta,
+        'models': files
+    }
+    with open(os.path.join(tmp_folder, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(folder, ignore_errors=True)
+    os.rename(tmp_folder, folder)
+    return manifest
+
+
+def load_checkpoint(folder, feature_version):
+    """
+    Read and validate the manifest. Returns (manifest, {name: LazyModel}).
+    Raises CheckpointError with a readable reason on any incompatibility.
+    """
+    manifest_path = os.path.join(folder, MANIFEST_NAME)
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise CheckpointError(f"Cannot read checkpoint manifest {manifest_path}: {e}")
+
+    if manifest.get('schema_version') != CHECKPOINT_SCHEMA_VERSION:
+        raise CheckpointError(f"Checkpoint schema version {manifest.get('schema_version')} is not supported "
+                              f"(expected {CHECKPOINT_SCHEMA_VERSION}).")
+    if manifest.get('feature_version') != feature_version:
+        raise CheckpointError(f"Checkpoint was trained on feature version {manifest.get('feature_version')}, "
+                              f"but this build extracts version {feature_version}.")
+    running = sklearn_version()
+    if manifest.get('sklearn_version') != running:
+        print(f"[Checkpoint] Warning: trained with scikit-learn {manifest.get('sklearn_version')}, "
+              f"running {running}.")
+
+    models = {}
+    for name, entry in manifest.get('models', {}).items():
+        path = os.path.join(folder, entry['file'])
+        if not os.path.exists(path):
+            raise CheckpointError(f"Checkpoint file {path} is missing.")
+        models[name] = LazyModel(path, entry.get('sha256'))
+
+    return manifest, models
+
+
+def update_checkpoint_model(folder, name, model):
+    """
+    Rewrite a single model of an existing checkpoint (e.g. after incremental inserts)
+    and its manifest entry, leaving the other files untouched. Both files are written
+    next to their targets and swapped in with os.replace.
+    """
+    manifest_path = os.path.join(folder, MANIFEST_NAME)
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise CheckpointError(f"Cannot read checkpoint manifest {manifest_path}: {e}")
+
+    filename = f"{name}.joblib"
+    path = os.path.join(folder, filename)
+    joblib.dump(model, path + ".tmp")
+    manifest['models'][name] = {'file': filename, 'sha256': file_sha256(path + ".tmp"),
+                                'bytes': os.path.getsize(path + ".tmp")}
+    with open(manifest_path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    os.replace(path + ".tmp", path)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return manifest
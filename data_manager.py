@@ -1,22 +1,168 @@
 import os
-import glob
+import zlib
+import itertools
+import collections
+import numpy as np
 import pandas as pd
 import warnings
-import librosa
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from audio_io import AudioReader
+from feature_store import FeatureStore, shard_folder
+from instrumentation import metrics
+
+# Recordings longer than this are featurized block by block instead of being decoded whole
+LONG_FILE_SECONDS = 120.0
+# Formats picked up by corpus discovery (decoded through soundfile/libsndfile)
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.ogg')
+# Clips per vectorized extraction call; smaller batches let decoding overlap extraction
+EXTRACT_BATCH = 16
+
+
+def _failure(filepath, stage, e):
+    metrics.count('files_failed', f"{stage}:{type(e).__name__}")
+    return {'Filepath': filepath, 'Stage': stage, 'Error': f"{type(e).__name__}: {e}"}
+
+
+def find_audio_files(folder, extensions=AUDIO_EXTENSIONS):
+    """
+    Recursively list the audio files under `folder` (nested date/site directories).
+    Uses os.scandir, so each directory is listed once and file types come from the
+    directory entries without a stat per file. Hidden and symlinked directories are not
+    entered; unreadable ones are skipped. Returns the paths sorted.
+    """
+    found, stack = [], [folder]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'): continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith(extensions) and entry.is_file():
+                        found.append(entry.path)
+        except OSError as e:
+            metrics.count('dirs_skipped', type(e).__name__)
+    return sorted(found)
+
+
+def _decode(filepath, sr):
+    """
+    Open a file and decode it, unless it is long enough to be featurized block by block.
+    Returns (reader, signal or None).
+    """
+    with metrics.stage('decode'):
+        reader = AudioReader(filepath, sr=sr)
+        if reader.duration <= LONG_FILE_SECONDS: return reader, reader.read()
+    return reader, None
+
+
+def _prefetch(fn, items, n_threads, depth=None):
+    """
+    Yield (item, result, exception) for fn(item) in input order, computed by `n_threads`
+    threads with at most `depth` calls in flight (default 2 * n_threads). Decoding is I/O
+    and C-library bound, so the threads read ahead while the caller extracts features.
+    """
+    depth = depth or 2 * n_threads
+    executor = ThreadPoolExecutor(max_workers=n_threads, thread_name_prefix="decode")
+    pending = collections.deque()
+    items = iter(items)
+    try:
+        while True:
+            for item in itertools.islice(items, depth - len(pending)):
+                pending.append((item, executor.submit(fn, item)))
+            if not pending: break
+            item, future = pending.popleft()
+            try:
+                yield item, future.result(), None
+            except Exception as e:
+                yield item, None, e
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def _featurize_chunk(task):
+    """
+    Worker entry point: decode a chunk of files and extract their features with vectorized
+    DSPCore.extract_features_batch calls of up to EXTRACT_BATCH clips. Files are decoded
+    by `decode_threads` prefetch threads while earlier clips are being featurized. Very long
+    recordings are instead featurized block by block (DSPCore.extract_features_blocks) and
+    never fully decoded.
+    Returns (results, metrics snapshot): one (features, failure) pair per file, where at
+    most one of them is set; both are None for clips that were skipped by the feature
+    extractor (e.g. too short). The snapshot carries this chunk's instrumentation back
+    from worker processes. Kept at module level so it can be pickled into a process pool.
+    """
+    filepaths, dsp_instance, instrument, decode_threads = task
+    # Spawned workers do not inherit a programmatic metrics.enable() from the parent
+    metrics.enable(instrument)
+    results = [(None, None)] * len(filepaths)
+    signals, positions = [], []
+
+    def flush():
+        try:
+            df = dsp_instance.extract_features_batch(signals, dsp_instance.sr)
+            for row_idx, feats in zip(df.index, df.to_dict('records')):
+                results[positions[row_idx]] = (feats, None)
+        except Exception as e:
+            # Fall back to per-file extraction so one bad clip does not fail the whole batch
+            metrics.count('batch_fallbacks', type(e).__name__)
+            for y, pos in zip(signals, positions):
+                try:
+                    results[pos] = (dsp_instance.extract_features(y, dsp_instance.sr) or None, None)
+                except Exception as e:
+                    results[pos] = (None, _failure(filepaths[pos], 'features', e))
+        signals.clear()
+        positions.clear()
+
+    # One filter for the whole chunk: catch_warnings is not thread-safe, so the decode
+    # threads must not enter it themselves
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        decoded = _prefetch(lambda pos: _decode(filepaths[pos], dsp_instance.sr), range(len(filepaths)),
+                            max(1, decode_threads))
+        for pos, out, error in decoded:
+            if error is not None:
+                results[pos] = (None, _failure(filepaths[pos], 'decode', error))
+                continue
+            reader, y = out
+            if y is not None:
+                signals.append(y)
+                positions.append(pos)
+                if len(signals) >= EXTRACT_BATCH: flush()
+                continue
+            try:
+                results[pos] = (dsp_instance.extract_features_blocks(reader.blocks, dsp_instance.sr), None)
+            except Exception as e:
+                results[pos] = (None, _failure(filepaths[pos], 'features', e))
+        if signals: flush()
+
+    return results, metrics.drain()
 
 
 class DataManager:
-    def __init__(self, data_folder):
+    def __init__(self, data_folder, n_workers=1):
         self.data_folder = data_folder
         # Filter strictly for these distinct species
         self.ALLOWED_SPECIES = ["Goat", "Pig", "WildBoar"]
 
+        # Number of worker processes used by scan_folder (1 = serial, None = all cores)
+        self.n_workers = n_workers
+        # Prefetch threads per worker decoding ahead of feature extraction
+        self.decode_threads = 4
+        # Optional ProcessPoolExecutor reused by every scan (kept warm, not shut down here);
+        # by default each multi-worker scan starts and stops its own pool
+        self.executor = None
+        # Structured records of files that failed during the last scan
+        self.scan_errors = []
+        # Paths featurized (not served from the cache) by the last scan
+        self.scan_changed = []
+
     def parse_filename(self, filepath):
         """
-        Parse metadata from filename structure: ID-Species-Context-Emotion-ID.wav
+        Parse metadata from filename structure: ID-Species-Context-Emotion-ID.<wav|flac|ogg>
         """
-        base = os.path.basename(filepath)
-        parts = base.replace('.wav', '').split('-')
+        base = os.path.splitext(os.path.basename(filepath))[0]
+        parts = base.split('-')
 
         # Ensure filename has enough segments
         if len(parts) >= 4:
@@ -27,6 +173,7 @@ class DataManager:
 
             # Filter non-target species
             if species not in self.ALLOWED_SPECIES:
+                metrics.count('files_skipped', 'non_target_species')
                 return None
 
             return {
@@ -35,40 +182,153 @@ class DataManager:
                 'Emotion': parts[3],
                 'Filepath': filepath
             }
+        metrics.count('files_skipped', 'bad_filename')
         return None
 
-    def scan_folder(self, dsp_instance):
+    def shard_of(self, filepath, n_shards):
+        """
+        Deterministic shard index of a file: crc32 of its path relative to the corpus root,
+        with '/' separators, so every node agrees whatever its mount point or OS.
+        """
+        relpath = os.path.relpath(filepath, self.data_folder).replace(os.sep, '/')
+        return zlib.crc32(relpath.encode('utf-8')) % n_shards
+
+    def _resolve_workers(self, n_workers):
+        if n_workers is None: n_workers = self.n_workers
+        if n_workers is None: n_workers = os.cpu_count() or 1
+        return max(1, int(n_workers))
+
+    def featurize_files(self, filepaths, dsp_instance, n_workers=None, chunksize=64):
         """
-        Scan the target folder and extract features for valid files.
+        Decode and featurize arbitrary files in chunks, with vectorized extraction batches
+        (see _featurize_chunk). Each worker decodes ahead on self.decode_threads threads.
+        With more than one worker, chunks run in a process pool (self.executor if set).
+        Yields (filepath, features, failure) in input order as chunks complete.
         """
+        n_workers = min(self._resolve_workers(n_workers), max(1, len(filepaths)))
+        tasks = [(filepaths[k:k + chunksize], dsp_instance, metrics.enabled, self.decode_threads)
+                 for k in range(0, len(filepaths), chunksize)]
+
+        if n_workers > 1 and self.executor is not None:
+            executor = None
+            chunk_results = self.executor.map(_featurize_chunk, tasks)
+        elif n_workers > 1:
+            executor = ProcessPoolExecutor(max_workers=n_workers)
+            chunk_results = executor.map(_featurize_chunk, tasks)
+        else:
+            executor = None
+            chunk_results = map(_featurize_chunk, tasks)
+
+        try:
+            for (paths, _, _, _), (chunk, snapshot) in zip(tasks, chunk_results):
+                # Worker-process metrics are merged here (in-process chunks just hand theirs back)
+                metrics.merge(snapshot)
+                for filepath, (feats, failure) in zip(paths, chunk):
+                    yield filepath, feats, failure
+        finally:
+            # An abandoned stream (e.g. a cancelled scan) drops the chunks not yet started
+            if executor is not None: executor.shutdown(cancel_futures=True)
+
+    def scan_folder(self, dsp_instance, n_workers=None, chunksize=None, cache=None, progress=None, shard=None):
+        """
+        Scan the target folder (recursively, see find_audio_files) and extract features
+        for valid files.
+        Files are featurized in chunks of `chunksize` (see featurize_files).
+        With more than one worker, chunks run in a process pool; results keep the
+        sorted file order, so the DataFrame matches the serial path.
+        If a FeatureCache is given, unchanged files are served from it and only
+        new or modified files are featurized; deleted files are dropped from it.
+        Files that fail to decode or featurize are recorded in self.scan_errors; the
+        featurized (new or modified) files in self.scan_changed.
+        `progress(done, total)` is called after every featurized file; an exception
+        raised from it aborts the scan.
+        `shard=(index, n_shards)` restricts the scan to the files of one shard (see shard_of);
+        the cache is then pruned to that shard, so give each shard its own cache file.
+        """
+        self.scan_errors, self.scan_changed = [], []
         if not os.path.exists(self.data_folder):
             return pd.DataFrame()
 
-        wav_files = glob.glob(os.path.join(self.data_folder, "*.wav"))
-        data_list = []
+        audio_files = find_audio_files(self.data_folder)
+        metas = [m for m in (self.parse_filename(f) for f in audio_files) if m]
+        if shard is not None:
+            metas = [m for m in metas if self.shard_of(m['Filepath'], shard[1]) == shard[0]]
 
-        print(f"[Data Scanner] Scanning {len(wav_files)} files for {self.ALLOWED_SPECIES}...")
+        # Serve unchanged files from the cache, queue the rest for extraction
+        features = [None] * len(metas)
+        pending = []
+        for i, meta in enumerate(metas):
+            hit = False
+            if cache is not None:
+                hit, features[i] = cache.lookup(meta['Filepath'])
+            if not hit: pending.append(i)
+        metrics.count('cache_hits', n=len(metas) - len(pending))
+        metrics.count('cache_misses', n=len(pending))
 
-        count = 0
-        for idx, f in enumerate(wav_files):
-            meta = self.parse_filename(f)
+        if cache is not None:
+            removed = cache.prune([m['Filepath'] for m in metas])
+            print(f"[Data Scanner] Cache: {len(metas) - len(pending)} unchanged, "
+                  f"{len(pending)} new/modified, {removed} removed.")
 
-            if meta:
-                try:
-                    with warnings.catch_warnings():
-                        warnings.simplefilter("ignore")
-                        y, sr = librosa.load(f, sr=dsp_instance.sr)
-                        feats = dsp_instance.extract_features(y, sr)
-
-                    if feats:
-                        row = {**meta, **feats}
-                        data_list.append(row)
-                        count += 1
-                except Exception:
-                    pass
+        n_workers = min(self._resolve_workers(n_workers), max(1, len(pending)))
+        print(f"[Data Scanner] Scanning {len(pending)} of {len(metas)} files for {self.ALLOWED_SPECIES} "
+              f"({n_workers} worker(s))...")
+
+        if chunksize is None: chunksize = max(1, min(64, len(pending) // (n_workers * 4)))
+        results = self.featurize_files([metas[i]['Filepath'] for i in pending], dsp_instance,
+                                       n_workers=n_workers, chunksize=chunksize)
+
+        count = 0
+        for idx, (i, (_, feats, failure)) in enumerate(zip(pending, results)):
+            if failure:
+                # Failed files are not cached so they are retried on the next scan
+                self.scan_errors.append(failure)
+            else:
+                features[i] = feats
+                self.scan_changed.append(metas[i]['Filepath'])
+                if cache is not None: cache.store(metas[i]['Filepath'], feats)
+                if feats: count += 1
 
             if (idx + 1) % 50 == 0:
-                print(f"Progress: {idx + 1}/{len(wav_files)} | Valid Samples: {count}")
+                print(f"Progress: {idx + 1}/{len(pending)} | Valid Samples: {count}")
+            if progress is not None: progress(idx + 1, len(pending))
+
+        df = self._feature_table(metas, features, dsp_instance.FEATURE_NAMES)
+
+        if self.scan_errors:
+            print(f"[Data Scanner] {len(self.scan_errors)} file(s) failed, see DataManager.scan_errors.")
+        print(f"[Complete] Extracted {len(df)} valid samples.")
+        return df
+
+    def scan_shard(self, dsp_instance, shard, n_shards, out_root, n_workers=None, cache=None):
+        """
+        Featurize one shard of the corpus and write it as a partial FeatureStore under
+        `out_root` (see FeatureStore.merge_shards). Independent processes or hosts sharing
+        the filesystem each run one shard. Returns the written store.
+        """
+        df = self.scan_folder(dsp_instance, n_workers=n_workers, cache=cache, shard=(shard, n_shards))
+        if df.empty: df = self._feature_table([], [], dsp_instance.FEATURE_NAMES)
+        return FeatureStore(shard_folder(out_root, shard, n_shards)).write(
+            df, dsp_instance.FEATURE_NAMES, dsp_instance.feature_version,
+            extra_meta={'shard': {'index': shard, 'count': n_shards, 'n_errors': len(self.scan_errors),
+                                  'data_folder': self.data_folder}})
+
+    @staticmethod
+    def _feature_table(metas, features, feature_names):
+        """
+        Assemble the scan result column by column: a float32 feature block, categorical
+        labels and the file paths (instead of one merged dict per file).
+        """
+        valid = [i for i, feats in enumerate(features) if feats]
+
+        matrix = np.empty((len(valid), len(feature_names)), dtype=np.float32)
+        for row, i in enumerate(valid):
+            feats = features[i]
+            matrix[row] = [feats.get(name, np.nan) for name in feature_names]
 
-        print(f"[Complete] Extracted {count} valid samples.")
-        return pd.DataFrame(data_list)
\ No newline at end of file
+        df = pd.DataFrame(matrix, columns=feature_names, copy=False)
+        labels = {col: pd.Categorical([metas[i][col] for i in valid]) for col in ('Species', 'Context', 'Emotion')}
+        for k, (col, values) in enumerate(labels.items()):
+            df.insert(k, col, values)
+        df.insert(len(labels), 'Filepath', [metas[i]['Filepath'] for i in valid])
+        return df
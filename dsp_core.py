@@ -1,11 +1,228 @@
 import numpy as np
+import pandas as pd
 import librosa
-import random
+from functools import lru_cache
+from scipy.fft import dct, rfft, irfft, next_fast_len
+from audio_io import load_audio, slice_blocks, frame_segments
+from instrumentation import metrics
+
+
+@lru_cache(maxsize=8)
+def _fft_window(n_fft):
+    return librosa.filters.get_window('hann', n_fft, fftbins=True)
+
+
+@lru_cache(maxsize=8)
+def _mel_filterbank(sr, n_fft):
+    return librosa.filters.mel(sr=sr, n_fft=n_fft)
+
+
+@lru_cache(maxsize=8)
+def _window_acf(n_fft, n):
+    # Normalized autocorrelation of the Hann window, used to undo its lag taper
+    acf = irfft(np.abs(rfft(_fft_window(n_fft), n)) ** 2, n)
+    return acf / acf[0]
 
 
 class DSPCore:
-    def __init__(self, sample_rate=22050):
+    # Bump whenever extract_features changes its output, so cached features are invalidated
+    FEATURE_VERSION = 3
+
+    # Analysis frame shared by every spectral feature (librosa defaults)
+    N_FFT = 2048
+    HOP_LENGTH = 512
+    N_MFCC = 13
+    MEL_TOP_DB = 80.0  # dynamic range of the log-mel spectrogram
+
+    FEATURE_NAMES = ['f0_mean', 'centroid_mean', 'bandwidth_mean', 'zcr_mean', 'duration'] + \
+                    [f'mfcc_{i + 1}' for i in range(N_MFCC)]
+
+    # F0 estimation: "yin" (librosa.yin on every frame), "gated_yin" (YIN on voiced frames only)
+    # or "autocorr" (FFT autocorrelation on voiced frames only)
+    F0_BACKENDS = ('yin', 'gated_yin', 'autocorr')
+    DEFAULT_F0_RANGE = (50.0, 2000.0)
+    # Typical call F0 ranges (Hz); pigs and boars grunt far below goat bleats
+    F0_RANGES = {'Goat': (80.0, 1200.0), 'Pig': (50.0, 1000.0), 'WildBoar': (50.0, 800.0)}
+    F0_GATE_DB = 30.0  # frames more than this below the loudest frame count as unvoiced
+    F0_GATE_ZCR = 0.3  # ... as do noise-like frames crossing zero more often than this
+    YIN_THRESHOLD = 0.1
+    AUTOCORR_MIN_PEAK = 0.3  # normalized autocorrelation peak below which a frame is unvoiced
+
+    def __init__(self, sample_rate=22050, f0_backend='yin', f0_range=None):
+        if f0_backend not in self.F0_BACKENDS: raise ValueError(f"Unknown f0_backend: {f0_backend}")
         self.sr = sample_rate
+        self.f0_backend = f0_backend
+        self.f0_range = tuple(f0_range) if f0_range else self.DEFAULT_F0_RANGE
+
+    @classmethod
+    def species_f0_range(cls, species):
+        """
+        The narrowest F0 range covering all of the given species.
+        """
+        ranges = [cls.F0_RANGES[sp] for sp in species if sp in cls.F0_RANGES]
+        if not ranges: return cls.DEFAULT_F0_RANGE
+        return min(lo for lo, _ in ranges), max(hi for _, hi in ranges)
+
+    @property
+    def feature_version(self):
+        """
+        Identifies the feature definition, including the F0 configuration, for caches and
+        checkpoints. The default configuration keeps the plain FEATURE_VERSION.
+        """
+        if self.f0_backend == 'yin' and self.f0_range == self.DEFAULT_F0_RANGE: return self.FEATURE_VERSION
+        return f"{self.FEATURE_VERSION}:{self.f0_backend}:{self.f0_range[0]:g}-{self.f0_range[1]:g}"
+
+    def _frame_signal(self, y):
+        """
+        Center-pad the signal and slice it into overlapping analysis frames of shape (..., n_fft, T).
+        """
+        pad = [(0, 0)] * (y.ndim - 1) + [(self.N_FFT // 2, self.N_FFT // 2)]
+        y_pad = np.pad(y, pad, mode='constant')
+        return librosa.util.frame(y_pad, frame_length=self.N_FFT, hop_length=self.HOP_LENGTH, axis=-1)
+
+    def _frame_features(self, frames, sr):
+        """
+        Per-frame spectral statistics derived from one shared magnitude STFT.
+        Returns centroid, bandwidth and ZCR of shape (..., T), the log-mel spectrogram
+        (..., n_mels, T) and the magnitude STFT itself (..., 1 + n_fft // 2, T).
+        """
+        S = np.abs(np.fft.rfft(frames * _fft_window(self.N_FFT)[:, None], axis=-2))
+        freqs = librosa.fft_frequencies(sr=sr, n_fft=self.N_FFT)[:, None]
+
+        # Centroid & bandwidth on the L1-normalized magnitude spectrum
+        norm = S.sum(axis=-2, keepdims=True)
+        S_norm = S / np.where(norm > 0, norm, 1.0)
+        centroid = np.sum(freqs * S_norm, axis=-2)
+        bandwidth = np.sqrt(np.sum(S_norm * (freqs - centroid[..., None, :]) ** 2, axis=-2))
+
+        # Zero-crossing rate on the same frames (zero counts as positive)
+        negative = frames < -1e-10
+        zcr = np.count_nonzero(negative[..., 1:, :] != negative[..., :-1, :], axis=-2) / self.N_FFT
+
+        # Mel power spectrogram in dB (ref=1.0, amin=1e-10)
+        mel = np.matmul(_mel_filterbank(sr, self.N_FFT), S ** 2)
+        log_mel = 10.0 * np.log10(np.maximum(mel, 1e-10))
+
+        return centroid, bandwidth, zcr, log_mel, S
+
+    def _voiced_frames(self, frames, zcr):
+        """
+        Energy/ZCR voicing gate over frames (..., n_fft, T): frames within F0_GATE_DB of the
+        loudest frame whose zero-crossing rate is below F0_GATE_ZCR. Returns a (..., T) mask.
+        """
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=-2))
+        floor = rms.max(axis=-1, keepdims=True) * 10 ** (-self.F0_GATE_DB / 20)
+        return (rms > floor) & (zcr < self.F0_GATE_ZCR)
+
+    def _lag_range(self, sr, max_lag):
+        fmin, fmax = self.f0_range
+        min_p = max(1, int(np.floor(sr / fmax)))
+        return min_p, max(min_p + 2, min(int(np.ceil(sr / fmin)), max_lag))
+
+    @staticmethod
+    def _refine_peaks(curve, idx):
+        # Parabolic interpolation of the extremum at idx of each row
+        rows = np.arange(len(curve))
+        k = np.clip(idx, 1, curve.shape[1] - 2)
+        a, b, c = curve[rows, k - 1], curve[rows, k], curve[rows, k + 1]
+        denom = a - 2 * b + c
+        shift = np.where(np.abs(denom) > 1e-12, 0.5 * (a - c) / np.where(denom == 0, 1, denom), 0.0)
+        return k + np.clip(shift, -1.0, 1.0)
+
+    def _yin_f0(self, x, sr):
+        """
+        librosa.yin on the rows of x (K, n_fft), frame by frame: cumulative mean normalized
+        difference over the whole frame (autocorrelation via FFT), first trough below
+        YIN_THRESHOLD else the global minimum, librosa's parabolic refinement.
+        """
+        min_p, max_p = self._lag_range(sr, self.N_FFT - 1)
+        n = next_fast_len(2 * self.N_FFT - 1)
+        acf = irfft(np.abs(rfft(x, n, axis=1)) ** 2, n, axis=1)[:, :max_p + 1]
+
+        # d(k) = 2 (r(0) - r(k)) - sum_{m<k} x(m)^2, as in librosa
+        energy = np.cumsum(np.square(x[:, :max_p]), axis=1)
+        d = 2 * (acf[:, :1] - acf[:, 1:]) - energy
+        cmean = np.cumsum(d, axis=1) / np.arange(1, max_p + 1)
+        search = d[:, min_p - 1:] / (cmean[:, min_p - 1:] + np.finfo(cmean.dtype).tiny)
+
+        # First element is a trough if below its neighbour; the last one may be a trough too
+        trough = np.empty(search.shape, dtype=bool)
+        trough[:, 0] = search[:, 0] < search[:, 1]
+        trough[:, 1:-1] = (search[:, 1:-1] < search[:, :-2]) & (search[:, 1:-1] <= search[:, 2:])
+        trough[:, -1] = search[:, -1] < search[:, -2]
+        below = trough & (search < self.YIN_THRESHOLD)
+        idx = np.where(below.any(axis=1), below.argmax(axis=1), search.argmin(axis=1))
+        return sr / (min_p + idx + self._yin_shift(search, idx))
+
+    @staticmethod
+    def _yin_shift(curve, idx):
+        # librosa's parabolic shift at idx of each row: 0 at the edges or when the vertex
+        # lies outside the neighbouring bins
+        rows = np.arange(len(curve))
+        k = np.clip(idx, 1, curve.shape[1] - 2)
+        a = curve[rows, k + 1] + curve[rows, k - 1] - 2 * curve[rows, k]
+        b = (curve[rows, k + 1] - curve[rows, k - 1]) / 2
+        inside = np.abs(b) < np.abs(a)
+        shift = np.where(inside, -b / np.where(inside, a, 1.0), 0.0)
+        return np.where((idx == 0) | (idx == curve.shape[1] - 1), 0.0, shift)
+
+    def _autocorr_f0(self, S, sr):
+        """
+        Autocorrelation pitch from the rows of the shared magnitude STFT S (K, 1 + n_fft // 2),
+        so no extra forward FFT is needed: the first local maximum within 90% of the strongest
+        peak in the F0 lag range (avoiding sub-octave picks), searched only past the first
+        negative lag (skipping the tail of the zero-lag lobe), or 0 if the normalized peak
+        is below AUTOCORR_MIN_PEAK.
+        """
+        min_p, max_p = self._lag_range(sr, self.N_FFT // 2)
+
+        # Circular autocorrelation of the Hann-windowed frame; the window's own (circular)
+        # autocorrelation is divided out. At these lags the wrap-around terms are negligible.
+        acf = irfft(np.square(S), self.N_FFT, axis=1)[:, :max_p + 1]
+        acf = acf / np.maximum(acf[:, :1], 1e-12) / _window_acf(self.N_FFT, self.N_FFT)[:max_p + 1]
+
+        negative = acf < 0
+        first_negative = np.where(negative.any(axis=1), negative.argmax(axis=1), acf.shape[1])
+        search = np.where(np.arange(min_p, max_p + 1) < first_negative[:, None], -1.0, acf[:, min_p:max_p + 1])
+
+        peak = search.max(axis=1, keepdims=True)
+        local_max = np.zeros(search.shape, dtype=bool)
+        local_max[:, 1:-1] = (search[:, 1:-1] >= search[:, :-2]) & (search[:, 1:-1] > search[:, 2:])
+        strong = local_max & (search >= 0.9 * peak)
+        idx = np.where(strong.any(axis=1), strong.argmax(axis=1), search.argmax(axis=1))
+
+        f0 = sr / (min_p + self._refine_peaks(-search, idx))
+        return np.where(peak[:, 0] >= self.AUTOCORR_MIN_PEAK, f0, 0.0)
+
+    def _frame_f0(self, y, frames, zcr, S, sr, center=True):
+        """
+        Per-frame F0 (..., T) on the STFT frame grid, 0 for unvoiced frames.
+        The yin backend runs librosa.yin over the whole signal; the gated backends only
+        analyze the frames passing the voicing gate (gated_yin gives librosa.yin's value on
+        those frames, autocorr reuses the magnitude STFT S).
+        """
+        fmin, fmax = self.f0_range
+        if self.f0_backend == 'yin':
+            f0 = librosa.yin(y, fmin=fmin, fmax=fmax, sr=sr, center=center)
+        else:
+            voiced = self._voiced_frames(frames, zcr)
+            f0 = np.zeros(voiced.shape)
+            if voiced.any():
+                if self.f0_backend == 'gated_yin':
+                    f0[voiced] = self._yin_f0(np.moveaxis(frames, -2, -1)[voiced], sr)
+                else:
+                    f0[voiced] = self._autocorr_f0(np.moveaxis(S, -2, -1)[voiced], sr)
+
+        # Estimates pinned at the lower bound are harmonic errors
+        return np.where(f0 > fmin, f0, 0.0)
+
+    def _mfcc_means(self, log_mel):
+        """
+        Time-averaged MFCCs. The DCT is linear, so averaging the clipped log-mel frames
+        first and transforming once gives the mean of the per-frame MFCCs.
+        """
+        log_mel = np.maximum(log_mel, log_mel.max() - self.MEL_TOP_DB)
+        return dct(log_mel.mean(axis=-1), type=2, norm='ortho')[:self.N_MFCC]
 
     def extract_features(self, y, sr=None):
         """
@@ -15,27 +232,34 @@ class DSPCore:
         if sr is None: sr = self.sr
 
         # Pre-processing: Trim silence with a top_db threshold
-        y_trimmed, _ = librosa.effects.trim(y, top_db=20)
+        with metrics.stage('features.trim'):
+            y_trimmed, _ = librosa.effects.trim(y, top_db=20)
 
         # Ignore extremely short audio clips
-        if len(y_trimmed) < sr * 0.05: return None
+        if len(y_trimmed) < sr * 0.05:
+            metrics.count('clips_skipped', 'too_short')
+            return None
 
-        # Basic spectral features
-        cent = librosa.feature.spectral_centroid(y=y_trimmed, sr=sr)
-        bw = librosa.feature.spectral_bandwidth(y=y_trimmed, sr=sr)
-        zcr = librosa.feature.zero_crossing_rate(y_trimmed)
+        # Spectral features: one framing + one STFT shared by centroid, bandwidth, ZCR and MFCC
+        with metrics.stage('features.spectral'):
+            frames = self._frame_signal(y_trimmed)
+            cent, bw, zcr, log_mel, S = self._frame_features(frames, sr)
 
-        # Advanced F0 extraction using the YIN algorithm
+        # Advanced F0 extraction (YIN by default, see F0_BACKENDS)
         try:
-            f0_series = librosa.yin(y_trimmed, fmin=50, fmax=2000, sr=sr)
-            # Filter out harmonic errors
-            f0_series = f0_series[f0_series > 50]
+            with metrics.stage('features.f0'):
+                f0_series = self._frame_f0(y_trimmed, frames, zcr, S, sr)
+            # Keep voiced frames only
+            f0_series = f0_series[f0_series > 0]
 
             if len(f0_series) > 0:
                 avg_f0 = np.mean(f0_series)
             else:
                 avg_f0 = 0.0
-        except:
+                metrics.count('clips_unvoiced')
+        except Exception as e:
+            # Unpitched clips still get spectral features; the failure is counted, not hidden
+            metrics.count('f0_errors', type(e).__name__)
             avg_f0 = 0.0
 
         features = {
@@ -43,54 +267,326 @@ class DSPCore:
             'centroid_mean': np.mean(cent),
             'bandwidth_mean': np.mean(bw),
             'zcr_mean': np.mean(zcr),
-            'duration': librosa.get_duration(y=y_trimmed, sr=sr)
+            'duration': len(y_trimmed) / sr
         }
 
         # MFCC extraction for timbre classification
-        mfcc = librosa.feature.mfcc(y=y_trimmed, sr=sr, n_mfcc=13)
-        for i in range(13): features[f'mfcc_{i + 1}'] = np.mean(mfcc[i])
+        with metrics.stage('features.mfcc'):
+            mfcc_means = self._mfcc_means(log_mel)
+        for i in range(self.N_MFCC): features[f'mfcc_{i + 1}'] = mfcc_means[i]
 
         return features
 
-    def variate_sample(self, original_path):
+    def trim_bounds(self, blocks, top_db=20):
         """
-        Single-shot Synthesis via DSP Augmentation.
-        Applies micro-modulations to pitch and time to simulate biological variability.
+        Streaming equivalent of librosa.effects.trim: returns the (start, end) sample range of
+        the non-silent part of a block stream. Only one RMS value per frame is kept in memory.
         """
+        n_samples = 0
+
+        def counted():
+            nonlocal n_samples
+            for block in blocks:
+                n_samples += len(block)
+                yield block
+
+        rms = [np.sqrt(np.mean(librosa.util.frame(seg, frame_length=self.N_FFT, hop_length=self.HOP_LENGTH) ** 2,
+                               axis=0))
+               for seg in frame_segments(counted(), self.N_FFT, self.HOP_LENGTH)]
+        if not rms: return 0, 0
+
+        db = librosa.amplitude_to_db(np.concatenate(rms), ref=np.max, top_db=None)
+        non_silent = np.flatnonzero(db > -top_db)
+        if len(non_silent) == 0: return 0, 0
+
+        start = int(non_silent[0] * self.HOP_LENGTH)
+        end = min(n_samples, int((non_silent[-1] + 1) * self.HOP_LENGTH))
+        return start, end
+
+    def extract_features_blocks(self, make_blocks, sr=None):
+        """
+        Extract the same features as extract_features from a block stream, with memory that
+        stays flat regardless of the signal length.
+        make_blocks() must return a fresh block iterator (e.g. AudioReader.blocks); the stream
+        is read once for trimming, once for features, and once more only if the log-mel range
+        exceeds MEL_TOP_DB and the MFCC means need clipping.
+        """
+        if sr is None: sr = self.sr
+
+        with metrics.stage('features.trim'):
+            start, end = self.trim_bounds(make_blocks())
+        if end - start < sr * 0.05:
+            metrics.count('clips_skipped', 'too_short')
+            return None
+
+        def segments():
+            return frame_segments(slice_blocks(make_blocks(), start, end), self.N_FFT, self.HOP_LENGTH)
+
+        n_frames, f0_sum, f0_count = 0, 0.0, 0
+        cent_sum = bw_sum = zcr_sum = 0.0
+        mel_sum, mel_max, mel_min = 0.0, -np.inf, np.inf
+        for seg in segments():
+            frames = librosa.util.frame(seg, frame_length=self.N_FFT, hop_length=self.HOP_LENGTH)
+            cent, bw, zcr, log_mel, S = self._frame_features(frames, sr)
+            n_frames += frames.shape[-1]
+            cent_sum, bw_sum, zcr_sum = cent_sum + cent.sum(), bw_sum + bw.sum(), zcr_sum + zcr.sum()
+            mel_sum = mel_sum + log_mel.sum(axis=-1)
+            mel_max, mel_min = max(mel_max, log_mel.max()), min(mel_min, log_mel.min())
+
+            try:
+                with metrics.stage('features.f0'):
+                    f0 = self._frame_f0(seg, frames, zcr, S, sr, center=False)
+                f0 = f0[f0 > 0]
+                f0_sum, f0_count = f0_sum + f0.sum(), f0_count + len(f0)
+            except Exception as e:
+                metrics.count('f0_errors', type(e).__name__)
+
+        # Clip the log-mel range relative to the global peak, which is only known after one pass
+        floor = mel_max - self.MEL_TOP_DB
+        if mel_min < floor:
+            mel_sum = 0.0
+            for seg in segments():
+                frames = librosa.util.frame(seg, frame_length=self.N_FFT, hop_length=self.HOP_LENGTH)
+                mel_sum = mel_sum + np.maximum(self._frame_features(frames, sr)[3], floor).sum(axis=-1)
+
+        features = {
+            'f0_mean': float(f0_sum / f0_count) if f0_count else 0.0,
+            'centroid_mean': cent_sum / n_frames,
+            'bandwidth_mean': bw_sum / n_frames,
+            'zcr_mean': zcr_sum / n_frames,
+            'duration': (end - start) / sr
+        }
+        mfcc_means = dct(mel_sum / n_frames, type=2, norm='ortho')[:self.N_MFCC]
+        for i in range(self.N_MFCC): features[f'mfcc_{i + 1}'] = mfcc_means[i]
+
+        return features
+
+    def extract_features_batch(self, signals, sr=None, max_frames=4096, bucket_ratio=1.25):
+        """
+        Vectorized feature extraction for many clips at once.
+        Trimmed clips are grouped into buckets of similar length and zero-padded to the bucket
+        maximum, so spectral statistics, MFCC means and YIN F0 run as 2-D array operations.
+        Frames past each clip's end are masked out, giving the same values as extract_features.
+        Returns a DataFrame indexed by input position; clips that are too short are omitted.
+        """
+        if sr is None: sr = self.sr
+
+        trimmed = {}
+        with metrics.stage('features.trim'):
+            for i, y in enumerate(signals):
+                y_trimmed, _ = librosa.effects.trim(np.asarray(y), top_db=20)
+                if len(y_trimmed) >= sr * 0.05:
+                    trimmed[i] = y_trimmed
+                else:
+                    metrics.count('clips_skipped', 'too_short')
+
+        blocks, index = [], []
+        for bucket in self._length_buckets(trimmed, max_frames, bucket_ratio):
+            blocks.append(self._bucket_features([trimmed[i] for i in bucket], sr))
+            index.extend(bucket)
+
+        if not blocks: return pd.DataFrame(columns=self.FEATURE_NAMES)
+        df = pd.DataFrame(np.vstack(blocks), index=index, columns=self.FEATURE_NAMES)
+        return df.sort_index()
+
+    def _length_buckets(self, clips, max_frames, bucket_ratio):
+        """
+        Group clip indices by length: a bucket is closed once the longest clip exceeds
+        bucket_ratio times the shortest one, or the padded bucket would exceed max_frames.
+        """
+        bucket = []
+        for i in sorted(clips, key=lambda k: len(clips[k])):
+            n_frames = 1 + len(clips[i]) // self.HOP_LENGTH
+            if bucket and (len(clips[i]) > bucket_ratio * len(clips[bucket[0]]) or
+                           (len(bucket) + 1) * n_frames > max_frames):
+                yield bucket
+                bucket = []
+            bucket.append(i)
+        if bucket: yield bucket
+
+    def _bucket_features(self, clips, sr):
+        """
+        Feature matrix (n_clips, n_features) for one bucket of trimmed clips, in FEATURE_NAMES order.
+        """
+        lengths = np.array([len(y) for y in clips])
+        Y = np.zeros((len(clips), lengths.max()), dtype=np.float32)
+        for row, y in zip(Y, clips): row[:len(y)] = y
+
+        with metrics.stage('features.spectral'):
+            frames = self._frame_signal(Y)
+            cent, bw, zcr, log_mel, S = self._frame_features(frames, sr)
+
+        # Valid (non-padding) frames per clip
+        n_frames = 1 + lengths // self.HOP_LENGTH
+        mask = np.arange(cent.shape[-1])[None, :] < n_frames[:, None]
+
+        def masked_mean(x):
+            return np.sum(np.where(mask, x, 0.0), axis=-1) / n_frames
+
+        # Clip each log-mel to MEL_TOP_DB below its own peak before averaging
+        with metrics.stage('features.mfcc'):
+            mel_mask = mask[:, None, :]
+            floor = np.where(mel_mask, log_mel, -np.inf).max(axis=(1, 2)) - self.MEL_TOP_DB
+            log_mel = np.maximum(log_mel, floor[:, None, None])
+            mel_mean = np.sum(np.where(mel_mask, log_mel, 0.0), axis=-1) / n_frames[:, None]
+            mfcc_means = dct(mel_mean, type=2, norm='ortho', axis=-1)[:, :self.N_MFCC]
+
+        # F0 over the padded batch; its frames line up with the STFT frames
         try:
-            # Load the original raw audio
-            y, sr = librosa.load(original_path, sr=self.sr)
+            with metrics.stage('features.f0'):
+                f0 = self._frame_f0(Y, frames, zcr, S, sr)
+            voiced = mask & (f0 > 0)
+            f0_mean = np.sum(np.where(voiced, f0, 0.0), axis=-1) / np.maximum(voiced.sum(axis=-1), 1)
+            metrics.count('clips_unvoiced', n=int(np.sum(voiced.sum(axis=-1) == 0)))
+        except Exception as e:
+            metrics.count('f0_errors', type(e).__name__, n=len(clips))
+            f0_mean = np.zeros(len(clips))
+
+        return np.column_stack([f0_mean, masked_mean(cent), masked_mean(bw), masked_mean(zcr),
+                                lengths / sr, mfcc_means])
+
+    def load_template(self, original_path):
+        """
+        Decode and trim a template recording for synthesis.
+        """
+        with metrics.stage('synthesis.load_template'):
+            y, _ = load_audio(original_path, sr=self.sr)
             y, _ = librosa.effects.trim(y, top_db=25)
+        return y
 
-            # 1. Micro Pitch Shifting: +/- 0.1 semitones
-            n_steps = random.uniform(-0.1, 0.1)
-            try:
-                y_shifted = librosa.effects.pitch_shift(y, sr=self.sr, n_steps=n_steps)
-            except:
-                y_shifted = y
+    def _phase_vocoder_batch(self, D, rates):
+        """
+        librosa.phase_vocoder for several stretch rates at once over one shared STFT.
+        The per-step phase advance is accumulated with a cumulative sum instead of a frame loop.
+        Returns the stretched STFTs (n_rates, F, T_max) and the mask of valid frames (n_rates, T_max).
+        """
+        n_bins, n_frames = D.shape
+        D = np.pad(D, [(0, 0), (0, 2)], mode='constant')
+        mag, angle = np.abs(D), np.angle(D)
+
+        # Expected phase advance per hop, and the wrapped deviation from it between columns
+        phi_advance = np.linspace(0, np.pi * self.HOP_LENGTH, n_bins)
+        dphase = angle[:, 1:] - angle[:, :-1] - phi_advance[:, None]
+        dphase -= 2.0 * np.pi * np.round(dphase / (2.0 * np.pi))
+
+        steps = [np.arange(0, n_frames, rate, dtype=np.float64) for rate in rates]
+        n_steps = max(len(st) for st in steps)
+        valid = np.arange(n_steps)[None, :] < np.array([len(st) for st in steps])[:, None]
+        step = np.zeros((len(rates), n_steps))
+        for k, st in enumerate(steps): step[k, :len(st)] = st
+
+        idx = step.astype(int)
+        alpha = (step - idx)[:, None, :]
+        frame_mag = (1.0 - alpha) * np.moveaxis(mag[:, idx], 0, 1) + alpha * np.moveaxis(mag[:, idx + 1], 0, 1)
 
-            # 2. Micro Time Stretching: +/- 2%
-            rate = random.uniform(0.98, 1.02)
-            y_stretched = librosa.effects.time_stretch(y_shifted, rate=rate)
+        increment = np.moveaxis(phi_advance[:, None, None] + dphase[:, idx], 0, 1)
+        phase = angle[:, 0][None, :, None] + np.cumsum(increment, axis=-1) - increment
 
-            # 3. Low-level Noise Injection for realism
-            noise_amp = 0.0005 * np.max(np.abs(y_stretched))
-            noise = np.random.normal(0, noise_amp, len(y_stretched))
-            y_final = y_stretched + noise
+        return frame_mag * np.exp(1j * phase) * valid[:, None, :], valid
 
-            # 4. Fade In/Out to prevent clicking artifacts
-            fade_samples = int(0.01 * self.sr)
-            if len(y_final) > 2 * fade_samples:
-                y_final[:fade_samples] *= np.linspace(0, 1, fade_samples)
-                y_final[-fade_samples:] *= np.linspace(1, 0, fade_samples)
+    def _istft_batch(self, D, valid, lengths):
+        """
+        Inverse STFT of a batch of spectrograms with per-row frame counts.
+        Each row is normalized by the window envelope of its own valid frames, so padded
+        frames do not attenuate the tail (as a shared librosa.istft normalization would).
+        """
+        window = _fft_window(self.N_FFT)
+        n_chunks = self.N_FFT // self.HOP_LENGTH
+        n_rows, _, n_frames = D.shape
+
+        frames = np.fft.irfft(D, n=self.N_FFT, axis=-2) * window[:, None]
+        frames = frames.reshape(n_rows, n_chunks, self.HOP_LENGTH, n_frames)
+        w_square = (window ** 2).reshape(n_chunks, self.HOP_LENGTH)
+
+        # Overlap-add: a frame spans n_chunks consecutive hops
+        y = np.zeros((n_rows, n_frames + n_chunks - 1, self.HOP_LENGTH))
+        envelope = np.zeros_like(y)
+        for q in range(n_chunks):
+            y[:, q:q + n_frames] += frames[:, q].transpose(0, 2, 1)
+            envelope[:, q:q + n_frames] += valid[:, :, None] * w_square[q]
 
-            # Normalization
-            if np.max(np.abs(y_final)) > 0:
-                y_final = y_final / np.max(np.abs(y_final))
+        y, envelope = y.reshape(n_rows, -1), envelope.reshape(n_rows, -1)
+        nonzero = envelope > np.finfo(envelope.dtype).tiny
+        y[nonzero] /= envelope[nonzero]
+        y = y[:, self.N_FFT // 2:]
+
+        out = np.zeros((n_rows, max(lengths)))
+        for k, n in enumerate(lengths):
+            n = min(n, y.shape[1])
+            out[k, :n] = y[k, :n]
+        return out
+
+    def augment_batch(self, y, n_variants, n_steps=None, rates=None, finish=True):
+        """
+        One-shot DSP Augmentation: renders n_variants micro pitch/time variations of one template.
+        The net pitch and rate change of each variant is applied with one phase-vocoder pass over a
+        single shared STFT and one resampling pass, instead of pitch_shift (stretch + resample)
+        followed by a second time_stretch.
+        finish=False skips noise injection, fades and normalization, leaving only the pitch/time
+        transform (e.g. to compare it against another implementation).
+        Returns (variants, lengths): a zero-padded (n_variants, max_len) array and the valid lengths.
+        """
+        # 1./2. Micro Pitch Shifting (+/- 0.1 semitones) and Time Stretching (+/- 2%)
+        if n_steps is None: n_steps = np.random.uniform(-0.1, 0.1, n_variants)
+        if rates is None: rates = np.random.uniform(0.98, 1.02, n_variants)
+        pitch = 2.0 ** (np.asarray(n_steps, dtype=float) / 12.0)
+        rates = np.asarray(rates, dtype=float)
 
-            return y_final, sr
+        # Stretch by rate/pitch, then resample by 1/pitch: duration scales by 1/rate, pitch by `pitch`
+        stretch = rates / pitch
+        stretched_len = [int(round(len(y) / a)) for a in stretch]
+        D = librosa.stft(y, n_fft=self.N_FFT, hop_length=self.HOP_LENGTH)
+        stretched = self._istft_batch(*self._phase_vocoder_batch(D, stretch), stretched_len)
+
+        lengths = np.array([int(round(len(y) / r)) for r in rates])
+        out = np.zeros((n_variants, lengths.max()))
+        for k in range(n_variants):
+            shifted = librosa.resample(stretched[k, :stretched_len[k]], orig_sr=self.sr * pitch[k], target_sr=self.sr)
+            out[k, :lengths[k]] = librosa.util.fix_length(shifted, size=lengths[k])
+        if not finish: return out, lengths
+        mask = np.arange(out.shape[1])[None, :] < lengths[:, None]
+
+        # 3. Low-level Noise Injection for realism
+        noise_amp = 0.0005 * np.max(np.abs(out), axis=1)
+        out += np.random.normal(0, 1, out.shape) * noise_amp[:, None] * mask
+
+        # 4. Fade In/Out to prevent clicking artifacts
+        fade_samples = int(0.01 * self.sr)
+        rows = np.flatnonzero(lengths > 2 * fade_samples)
+        if len(rows):
+            ramp = np.linspace(0, 1, fade_samples)
+            out[rows, :fade_samples] *= ramp
+            tail = lengths[rows, None] - fade_samples + np.arange(fade_samples)
+            out[rows[:, None], tail] *= ramp[::-1]
+
+        # Normalization
+        peak = np.max(np.abs(out), axis=1)
+        out[peak > 0] /= peak[peak > 0, None]
+
+        return out, lengths
+
+    def variate_signal(self, y):
+        """
+        DSP Augmentation of an already loaded template: one random variant from augment_batch.
+        """
+        with metrics.stage('synthesis.augment'):
+            variants, lengths = self.augment_batch(y, 1)
+        return variants[0, :lengths[0]]
+
+    def silence(self):
+        # Returned in place of a synthesized call when synthesis fails
+        return np.zeros(int(self.sr * 0.5)), self.sr
+
+    def variate_sample(self, original_path):
+        """
+        Single-shot Synthesis via DSP Augmentation.
+        Loads the template and applies variate_signal to it.
+        """
+        try:
+            return self.variate_signal(self.load_template(original_path)), self.sr
 
         except Exception as e:
             print(f"[DSP Error] {e}")
+            metrics.count('synthesis_errors', type(e).__name__)
             # Return silence on failure
-            return np.zeros(int(self.sr * 0.5)), self.sr
\ No newline at end of file
+            return self.silence()
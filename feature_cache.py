@@ -0,0 +1,88 @@
+import os
+import joblib
+
+
+class FeatureCache:
+    """
+    Persistent per-file feature store used to make corpus rescans incremental.
+    Each entry is keyed by the absolute file path and fingerprinted by file size
+    and modification time, so only added or modified recordings are re-featurized.
+    The whole cache is invalidated when the DSP feature version changes.
+    """
+
+    def __init__(self, cache_file="feature_cache.pkl", feature_version=1):
+        self.cache_file = cache_file
+        self.feature_version = feature_version
+        # key -> {'fingerprint': (size, mtime_ns), 'features': dict or None}
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(filepath):
+        return os.path.normcase(os.path.abspath(filepath))
+
+    @staticmethod
+    def fingerprint(filepath):
+        st = os.stat(filepath)
+        return st.st_size, st.st_mtime_ns
+
+    def load(self):
+        """
+        Load entries from disk. A missing, unreadable or outdated cache starts empty.
+        """
+        self.entries = {}
+        if not os.path.exists(self.cache_file):
+            return self
+
+        try:
+            payload = joblib.load(self.cache_file)
+        except Exception as e:
+            print(f"[Feature Cache] Ignoring unreadable cache ({e}).")
+            return self
+
+        if payload.get('feature_version') != self.feature_version:
+            print(f"[Feature Cache] Feature version changed "
+                  f"({payload.get('feature_version')} -> {self.feature_version}), starting fresh.")
+            return self
+
+        self.entries = payload.get('entries', {})
+        return self
+
+    def save(self):
+        # Write to a temporary file first so an interrupted save never corrupts the cache
+        tmp_file = self.cache_file + ".tmp"
+        joblib.dump({'feature_version': self.feature_version, 'entries': self.entries}, tmp_file)
+        os.replace(tmp_file, self.cache_file)
+
+    def lookup(self, filepath):
+        """
+        Return (hit, features). features is None for clips the extractor skipped.
+        """
+        entry = self.entries.get(self.key(filepath))
+        if entry is not None:
+            try:
+                if entry['fingerprint'] == self.fingerprint(filepath):
+                    self.hits += 1
+                    return True, entry['features']
+            except OSError:
+                pass
+        self.misses += 1
+        return False, None
+
+    def store(self, filepath, features):
+        try:
+            fp = self.fingerprint(filepath)
+        except OSError:
+            return
+        self.entries[self.key(filepath)] = {'fingerprint': fp, 'features': features}
+
+    def prune(self, filepaths):
+        """
+        Drop entries for files that are no longer part of the corpus.
+        Returns the number of removed entries.
+        """
+        keep = {self.key(f) for f in filepaths}
+        stale = [k for k in self.entries if k not in keep]
+        for k in stale: del self.entries[k]
+        return len(stale)
@@ -0,0 +1,191 @@
+import os
+import json
+import shutil
+import numpy as np
+import pandas as pd
+
+# Bump whenever the store layout or metadata fields change
+STORE_SCHEMA_VERSION = 2
+META_NAME = "meta.json"
+# Partial stores written by sharded scans: <root>/shard-00003-of-00008
+SHARD_FORMAT = "shard-{:05d}-of-{:05d}"
+
+
+def shard_folder(root, shard, n_shards):
+    return os.path.join(root, SHARD_FORMAT.format(shard, n_shards))
+
+
+class FeatureStore:
+    """
+    Columnar on-disk feature table of a scanned corpus.
+    Features are one float32 (n_rows, n_features) .npy matrix, the labels are integer codes
+    into per-column category lists, and paths are one UTF-8 byte array plus row offsets
+    (a fixed-width string array pads every path to the longest, at 4 bytes per character).
+    Everything is opened with np.load(mmap_mode='r'), so loading is near-instant and training
+    reads the float32 matrix without a copy (the forests use float32 internally); paths are
+    decoded on first use.
+    """
+
+    LABEL_COLS = ['Species', 'Context', 'Emotion']
+
+    def __init__(self, folder="feature_store"):
+        self.folder = folder
+        self.meta = None
+        self.features = None
+        self.codes = None
+        self._path_bytes = None
+        self._path_offsets = None
+        self._paths = None
+
+    @property
+    def feature_names(self):
+        return self.meta['feature_names']
+
+    @property
+    def categories(self):
+        return self.meta['categories']
+
+    @property
+    def paths(self):
+        """
+        Filepath of every row, as an object array of str.
+        """
+        if self._paths is None and self._path_offsets is not None:
+            data, offsets = self._path_bytes.tobytes(), self._path_offsets.tolist()
+            self._paths = np.array([data[a:b].decode('utf-8') for a, b in zip(offsets[:-1], offsets[1:])],
+                                   dtype=object)
+        return self._paths
+
+    def __len__(self):
+        return 0 if self.features is None else len(self.features)
+
+    def exists(self):
+        return os.path.exists(os.path.join(self.folder, META_NAME))
+
+    def write(self, df, feature_names, feature_version, extra_meta=None):
+        """
+        Persist a scan_folder table (label columns, Filepath and feature columns).
+        The store is assembled in a temporary folder first, then swapped in.
+        `extra_meta` is stored alongside the schema fields (e.g. shard information).
+        """
+        tmp_folder = self.folder + ".tmp"
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+        os.makedirs(tmp_folder)
+
+        categories, codes = {}, np.empty((len(df), len(self.LABEL_COLS)), dtype=np.int32)
+        for j, col in enumerate(self.LABEL_COLS):
+            cat = pd.Categorical(df[col])
+            categories[col] = [str(c) for c in cat.categories]
+            codes[:, j] = cat.codes
+
+        np.save(os.path.join(tmp_folder, "features.npy"),
+                np.ascontiguousarray(df[feature_names].to_numpy(dtype=np.float32)))
+        np.save(os.path.join(tmp_folder, "codes.npy"), codes)
+        encoded = [str(p).encode('utf-8') for p in df['Filepath']]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        np.save(os.path.join(tmp_folder, "path_bytes.npy"), np.frombuffer(b''.join(encoded), dtype=np.uint8))
+        np.save(os.path.join(tmp_folder, "path_offsets.npy"), offsets)
+
+        meta = {
+            'schema_version': STORE_SCHEMA_VERSION,
+            'feature_version': feature_version,
+            'feature_names': list(feature_names),
+            'categories': categories,
+            'n_rows': len(df),
+            **(extra_meta or {})
+        }
+        with open(os.path.join(tmp_folder, META_NAME), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+        # Release our own memory maps of the old store before replacing it (required on Windows)
+        self.features = self.codes = self._path_bytes = self._path_offsets = self._paths = None
+        shutil.rmtree(self.folder, ignore_errors=True)
+        os.rename(tmp_folder, self.folder)
+        return self.load()
+
+    def load(self, feature_version=None, mmap_mode='r'):
+        """
+        Open the store memory-mapped. Raises ValueError if it is missing, from another
+        schema, or (when feature_version is given) extracted with other features.
+        """
+        try:
+            with open(os.path.join(self.folder, META_NAME), encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Cannot read feature store {self.folder}: {e}")
+
+        if meta.get('schema_version') != STORE_SCHEMA_VERSION:
+            raise ValueError(f"Feature store schema {meta.get('schema_version')} is not supported.")
+        if feature_version is not None and meta.get('feature_version') != feature_version:
+            raise ValueError(f"Feature store holds feature version {meta.get('feature_version')}, "
+                             f"expected {feature_version}.")
+
+        self.meta = meta
+        self.features = np.load(os.path.join(self.folder, "features.npy"), mmap_mode=mmap_mode)
+        self.codes = np.load(os.path.join(self.folder, "codes.npy"), mmap_mode=mmap_mode)
+        self._path_bytes = np.load(os.path.join(self.folder, "path_bytes.npy"), mmap_mode=mmap_mode)
+        self._path_offsets = np.load(os.path.join(self.folder, "path_offsets.npy"), mmap_mode=mmap_mode)
+        self._paths = None
+        return self
+
+    def labels(self, col):
+        """
+        One label column as a pandas Categorical backed by the stored codes.
+        """
+        j = self.LABEL_COLS.index(col)
+        return pd.Categorical.from_codes(self.codes[:, j], categories=self.categories[col])
+
+    def label_frame(self):
+        return pd.DataFrame({col: self.labels(col) for col in self.LABEL_COLS})
+
+    def to_frame(self):
+        """
+        The table as a DataFrame shaped like scan_folder output. The feature block wraps
+        the memory-mapped matrix without copying; labels are categorical.
+        """
+        df = pd.DataFrame(self.features, columns=self.feature_names, copy=False)
+        for col in reversed(self.LABEL_COLS):
+            df.insert(0, col, self.labels(col))
+        df.insert(len(self.LABEL_COLS), 'Filepath', self.paths)
+        return df
+
+    def merge_shards(self, root, feature_version=None, data_folder=None):
+        """
+        Assemble the partial stores of a sharded scan (DataManager.scan_shard) found under
+        `root` into this store. Every shard of the run must be present exactly once and
+        share the feature version and columns; otherwise ValueError is raised. Rows are
+        sorted by path, so the result matches a single-node scan_folder of the corpus.
+        With `data_folder`, paths are rebased from each node's corpus root onto it (nodes
+        may mount the shared filesystem at different paths).
+        """
+        folders = sorted(os.path.join(root, name) for name in os.listdir(root)
+                         if name.startswith("shard-") and os.path.isdir(os.path.join(root, name))
+                         and not name.endswith(".tmp"))
+        if not folders: raise ValueError(f"No shard stores found in {root}.")
+
+        shards = [FeatureStore(folder).load(feature_version) for folder in folders]
+        counts = {store.meta.get('shard', {}).get('count') for store in shards}
+        if len(counts) != 1 or None in counts:
+            raise ValueError(f"Shard stores in {root} come from different runs (shard counts {counts}).")
+        n_shards = counts.pop()
+        missing = sorted(set(range(n_shards)) - {store.meta['shard']['index'] for store in shards})
+        if missing: raise ValueError(f"Shards {missing} of {n_shards} are missing in {root}.")
+
+        feature_names, feature_version = shards[0].feature_names, shards[0].meta['feature_version']
+        if any(store.feature_names != feature_names or store.meta['feature_version'] != feature_version
+               for store in shards):
+            raise ValueError(f"Shard stores in {root} were extracted with different features.")
+
+        frames = []
+        for store in shards:
+            df = store.to_frame()
+            if data_folder is not None:
+                shard_root = store.meta['shard']['data_folder']
+                df['Filepath'] = [os.path.join(data_folder, os.path.relpath(p, shard_root)) for p in df['Filepath']]
+            frames.append(df)
+        df = pd.concat(frames, ignore_index=True).sort_values('Filepath', kind='stable', ignore_index=True)
+
+        meta = {'merged_from': {'count': n_shards,
+                                'n_errors': sum(store.meta['shard']['n_errors'] for store in shards)}}
+        return self.write(df, feature_names, feature_version, extra_meta=meta)
@@ -1,13 +1,9 @@
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
-import threading
-import numpy as np
-import librosa.display
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from scipy.io import wavfile
-import sounddevice as sd
-from model_engine import ModelEngine
+from job_scheduler import JobScheduler
+
+# The scientific stack (librosa, scikit-learn, matplotlib, sounddevice) is imported on
+# worker threads after the window is up; see run_init_task and load_gui_modules.
 
 # --- UI Color Scheme ---
 COLOR_BG = "#f4f6f9"
@@ -39,7 +35,10 @@ class BioTranslatorApp(tk.Tk):
         self.geometry("1280x860")
         self.configure(bg=COLOR_BG)
 
-        self.engine = ModelEngine()
+        # Created by the init job, so importing the model stack does not delay the first frame
+        self.engine = None
+        self.view_l = None
+        self.view_r = None
         self.ui_tree = {}
         self.last_wave = None
         self.last_sr = 22050
@@ -47,7 +46,13 @@ class BioTranslatorApp(tk.Tk):
         self.setup_styles()
         self.create_ui()
 
-        threading.Thread(target=self.run_init_task, daemon=True).start()
+        # Engine calls run on worker threads; results come back through the scheduler
+        self.jobs = JobScheduler(self)
+        self.bind("<Escape>", self.on_cancel)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.run_init_task()
+        self.jobs.submit('gui_modules', self.load_gui_modules, on_done=lambda _: self.create_plots(),
+                         on_error=lambda e: self.status_var.set(f"Plotting unavailable: {e}"))
 
     def setup_styles(self):
         style = ttk.Style()
@@ -56,10 +61,76 @@ class BioTranslatorApp(tk.Tk):
         style.map("TCombobox", fieldbackground=[('readonly', '#ecf0f1')])
         style.configure("TLabel", background=COLOR_CARD, foreground=COLOR_TEXT, font=FONT_LABEL)
 
-    def run_init_task(self):
-        self.status_var.set("Initializing database...")
-        sample_db = self.engine.initialize_system()
-        self.after(0, lambda: self.update_ui_state(sample_db))
+    def run_init_task(self, retrain=False):
+        self.set_busy(True)
+        self.status_var.set("Rescanning database... (Esc to cancel)" if retrain else "Initializing database...")
+
+        def task(job):
+            if self.engine is None: self.engine = self.create_engine()
+            if retrain:
+                # Cancelled engine calls still run to completion; the checkpoint, models and
+                # synthesis pool are only replaced once they have stopped
+                self.jobs.wait('analyze', 'generate', 'warmup')
+                return self.engine.force_retrain(progress=job.progress)
+            return self.engine.initialize_system(progress=job.progress)
+
+        def on_progress(done, total):
+            self.status_var.set(f"Scanning audio files: {done}/{total} (Esc to cancel)")
+
+        def on_done(sample_db):
+            self.set_busy(False)
+            self.update_ui_state(sample_db)
+            # Models are loaded lazily; warm them up here so the first analysis is instant
+            if sample_db: self.jobs.submit('warmup', self.warm_up)
+
+        def on_error(e):
+            self.set_busy(False)
+            self.status_var.set(f"Initialization failed: {e}")
+
+        self.jobs.submit('init', task, on_done=on_done, on_error=on_error, on_progress=on_progress,
+                         on_cancelled=self.on_init_cancelled)
+
+    def on_init_cancelled(self):
+        self.set_busy(False)
+        if self.engine is not None and self.engine.is_trained:
+            # Cancelled after the scan had already finished; the new models are complete
+            self.update_ui_state(self.engine.template_db)
+        else:
+            self.status_var.set("Scan cancelled. Use 'Reload DB' to resume; files scanned so far are cached.")
+
+    @staticmethod
+    def create_engine():
+        from model_engine import ModelEngine
+        return ModelEngine()
+
+    @staticmethod
+    def load_gui_modules(job):
+        # Import only; the Tk widgets themselves must be created on the main thread
+        import matplotlib.figure
+        import matplotlib.backends.backend_tkagg
+        import plot_utils
+        import sounddevice
+        import scipy.io.wavfile
+
+    def warm_up(self, job):
+        self.engine.load_models()
+        self.engine.prefill_synthesis()
+
+    def set_busy(self, busy):
+        # Analysis and synthesis use the models being rebuilt, so they wait for init to finish
+        state = tk.DISABLED if busy else tk.NORMAL
+        self.btn_upload.config(state=state)
+        if busy or (self.engine is not None and self.engine.template_db): self.btn_gen.config(state=state)
+
+    def on_cancel(self, event=None):
+        if self.jobs.cancel('init'):
+            self.status_var.set("Cancelling scan...")
+        elif self.jobs.cancel('analyze') + self.jobs.cancel('generate'):
+            self.status_var.set("Cancelled.")
+
+    def on_close(self):
+        self.jobs.shutdown()
+        self.destroy()
 
     def update_ui_state(self, sample_db):
         self.ui_tree = {}
@@ -77,6 +148,8 @@ class BioTranslatorApp(tk.Tk):
 
             self.btn_gen.config(state=tk.NORMAL, bg=COLOR_BTN_GEN)
             self.status_var.set(f"System Ready. Indexed {len(sample_db)} behaviors.")
+        elif self.engine.load_error:
+            self.status_var.set(f"{self.engine.load_error} Use 'Reload DB' to retrain.")
         else:
             self.status_var.set("No data found.")
 
@@ -92,12 +165,15 @@ class BioTranslatorApp(tk.Tk):
 
     # === Core Business Logic ===
     def on_upload(self):
-        path = filedialog.askopenfilename(filetypes=[("Audio Files", "*.wav")])
+        path = filedialog.askopenfilename(filetypes=[("Audio Files", "*.wav *.flac *.ogg")])
         if not path: return
         self.status_var.set(f"Analyzing: {path}")
-        self.update()
 
-        res = self.engine.predict_audio(path)
+        # A newer file supersedes an analysis still in progress
+        self.jobs.submit('analyze', lambda job: self.engine.predict_audio(path), on_done=self.show_analysis,
+                         on_error=lambda e: self.status_var.set(f"Analysis failed: {e}"), coalesce='replace')
+
+    def show_analysis(self, res):
         if res and 'Error' not in res:
             f0_val = res['Features']['f0_mean']
             f0_str = f"{f0_val:.1f} Hz" if f0_val > 0 else "Unvoiced"
@@ -105,12 +181,11 @@ class BioTranslatorApp(tk.Tk):
             self.update_text_result(res['Species'], res['Context'], res['Emotion'], f0_str,
                                     res['Features']['centroid_mean'])
 
-            y, sr = res['Audio'], res['SR']
-            self.plot_waveform(self.ax_l[0], y, sr, "Waveform", color=COLOR_WAVE)
-            self.plot_spectrum(self.ax_l[1], y, sr, "Frequency Spectrum (FFT)", color=COLOR_WAVE)
-
-            self.canvas_l.draw()
+            if self.view_l is not None:
+                self.view_l.show(res['Audio'], res['SR'], "Waveform", "Frequency Spectrum (Welch)")
             self.status_var.set("Analysis Complete.")
+        else:
+            self.status_var.set(f"Analysis failed: {res['Error'] if res else 'the clip is too short or silent.'}")
 
     def on_generate(self):
         sp = self.combo_sp.get()
@@ -120,8 +195,12 @@ class BioTranslatorApp(tk.Tk):
 
         self.status_var.set(f"Synthesizing: {sp} - {ctx}...")
 
-        wave, sr = self.engine.generate_audio(sp, ctx)
+        # Repeated clicks while a variant is being produced are coalesced into that one
+        self.jobs.submit('generate', lambda job: self.engine.generate_audio(sp, ctx),
+                         on_done=lambda result: self.show_synthesis(sp, ctx, *result),
+                         on_error=lambda e: self.status_var.set(f"Synthesis failed: {e}"))
 
+    def show_synthesis(self, sp, ctx, wave, sr):
         if wave is not None:
             self.last_wave = wave
             self.last_sr = sr
@@ -132,12 +211,8 @@ class BioTranslatorApp(tk.Tk):
 
             self.play_audio()
 
-            self.ax_r[0].clear();
-            self.ax_r[1].clear()
-            self.plot_waveform(self.ax_r[0], wave, sr, "Synthesized Waveform", color=COLOR_SPEC)
-            self.plot_spectrum(self.ax_r[1], wave, sr, "Frequency Spectrum (FFT)", color=COLOR_SPEC)
-
-            self.canvas_r.draw()
+            if self.view_r is not None:
+                self.view_r.show(wave, sr, "Synthesized Waveform", "Frequency Spectrum (Welch)")
             self.status_var.set("Synthesis Complete.")
         else:
             messagebox.showerror("Data Error", f"No recording found for [{sp}] in [{ctx}] context.")
@@ -156,52 +231,30 @@ class BioTranslatorApp(tk.Tk):
         self.txt_res.insert(tk.END, content)
         self.txt_res.config(state='disabled')
 
-        # === Plotting Functions ===
-
-    def plot_waveform(self, ax, y, sr, title, color):
-        ax.clear()
-        t = np.linspace(0, len(y) / sr, len(y))
-        ax.plot(t, y, color=color, lw=0.8)
-
-        ax.set_title(title, fontsize=9, color=COLOR_SUBTEXT, pad=5)
-        ax.set_xlabel("Time (s)", fontsize=8)
-        ax.set_ylabel("Amplitude", fontsize=8)
-        ax.tick_params(axis='both', which='major', labelsize=8)
-        ax.grid(True, alpha=0.3, linestyle='--')
-        ax.margins(x=0)
-
-    def plot_spectrum(self, ax, y, sr, title, color):
-        ax.clear()
-        mag = np.abs(np.fft.rfft(y))
-        freqs = np.fft.rfftfreq(len(y), 1 / sr)
-
-        ax.plot(freqs, mag, color=color, lw=0.8)
-        ax.set_xlim(0, 4000)
-
-        ax.set_title(title, fontsize=9, color=COLOR_SUBTEXT, pad=5)
-        ax.set_xlabel("Frequency (Hz)", fontsize=8)
-        ax.set_ylabel("Magnitude", fontsize=8)
-        ax.tick_params(axis='both', which='major', labelsize=8)
-        ax.grid(True, alpha=0.3, linestyle='--')
-
     # === Audio Control ===
     def play_audio(self):
+        import sounddevice as sd
         if self.last_wave is not None:
             sd.stop()
             sd.play(self.last_wave, self.last_sr)
 
     def stop_audio(self):
+        import sounddevice as sd
         sd.stop()
 
     def on_save(self):
+        from scipy.io import wavfile
         if self.last_wave is None: return
         path = filedialog.asksaveasfilename(defaultextension=".wav")
-        if path: wavfile.write(path, self.last_sr, self.last_wave.astype(np.float32))
+        if path: wavfile.write(path, self.last_sr, self.last_wave.astype('float32'))
 
     def on_retrain(self):
+        if self.jobs.is_running('init'): return
         if messagebox.askyesno("Reload", "Rescan all audio files?"):
-            self.engine.force_retrain()
-            self.run_init_task()
+            # Analysis/synthesis jobs must not see the engine while its models are replaced:
+            # queued ones are dropped, and the retrain waits for those already running
+            for key in ('analyze', 'generate', 'warmup'): self.jobs.cancel(key)
+            self.run_init_task(retrain=True)
 
     # === Layout ===
     def create_ui(self):
@@ -228,17 +281,17 @@ class BioTranslatorApp(tk.Tk):
 
         lc = tk.Frame(left_card, bg=COLOR_CARD, padx=15)
         lc.pack(fill=tk.BOTH, expand=True)
-        tk.Button(lc, text="📁 Select Audio File", command=self.on_upload, bg="#3498db", fg="white", font=FONT_BTN,
-                  relief="flat", height=2).pack(fill=tk.X)
+        self.btn_upload = tk.Button(lc, text="📁 Select Audio File", command=self.on_upload, bg="#3498db",
+                                    fg="white", font=FONT_BTN, relief="flat", height=2)
+        self.btn_upload.pack(fill=tk.X)
 
         self.txt_res = tk.Text(lc, height=7, width=40, font=FONT_MONO, bg="#f8f9fa", fg=COLOR_TEXT, relief="flat",
                                state="disabled")
         self.txt_res.pack(fill=tk.X, pady=15)
 
-        self.fig_l, self.ax_l = plt.subplots(2, 1, figsize=(5, 4))
-        self.fig_l.subplots_adjust(left=0.15, right=0.95, top=0.9, bottom=0.15, hspace=0.6)
-        self.canvas_l = FigureCanvasTkAgg(self.fig_l, lc)
-        self.canvas_l.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # Filled with the matplotlib canvas by create_plots once matplotlib is imported
+        self.plot_frame_l = tk.Frame(lc, bg=COLOR_CARD)
+        self.plot_frame_l.pack(fill=tk.BOTH, expand=True)
 
         # Right Card
         right_card = tk.Frame(container, bg=COLOR_CARD)
@@ -275,10 +328,8 @@ class BioTranslatorApp(tk.Tk):
                                   font=FONT_BTN, relief="flat", state=tk.DISABLED)
         self.btn_stop.pack(side=tk.RIGHT, fill=tk.X, expand=True, padx=(5, 0))
 
-        self.fig_r, self.ax_r = plt.subplots(2, 1, figsize=(5, 3.5))
-        self.fig_r.subplots_adjust(left=0.15, right=0.95, top=0.9, bottom=0.15, hspace=0.6)
-        self.canvas_r = FigureCanvasTkAgg(self.fig_r, rc)
-        self.canvas_r.get_tk_widget().pack(fill=tk.BOTH, expand=True, pady=10)
+        self.plot_frame_r = tk.Frame(rc, bg=COLOR_CARD)
+        self.plot_frame_r.pack(fill=tk.BOTH, expand=True, pady=10)
 
         self.btn_save = tk.Button(rc, text="Save to Disk", command=self.on_save, bg="#bdc3c7", fg="white",
                                   relief="flat", state=tk.DISABLED)
@@ -286,4 +337,24 @@ class BioTranslatorApp(tk.Tk):
 
         self.status_var = tk.StringVar(value="System initializing...")
         tk.Label(self, textvariable=self.status_var, bg=COLOR_HEADER, fg="white", anchor="w", padx=15, pady=5).pack(
-            side=tk.BOTTOM, fill=tk.X)
\ No newline at end of file
+            side=tk.BOTTOM, fill=tk.X)
+
+    def create_plots(self):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from plot_utils import SignalView
+
+        # Figure instead of pyplot: no global figure manager, nothing to close on exit
+        self.fig_l = Figure(figsize=(5, 4))
+        self.ax_l = self.fig_l.subplots(2, 1)
+        self.fig_l.subplots_adjust(left=0.15, right=0.95, top=0.9, bottom=0.15, hspace=0.6)
+        self.canvas_l = FigureCanvasTkAgg(self.fig_l, self.plot_frame_l)
+        self.canvas_l.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.view_l = SignalView(self.canvas_l, self.ax_l[0], self.ax_l[1], COLOR_WAVE, COLOR_SUBTEXT)
+
+        self.fig_r = Figure(figsize=(5, 3.5))
+        self.ax_r = self.fig_r.subplots(2, 1)
+        self.fig_r.subplots_adjust(left=0.15, right=0.95, top=0.9, bottom=0.15, hspace=0.6)
+        self.canvas_r = FigureCanvasTkAgg(self.fig_r, self.plot_frame_r)
+        self.canvas_r.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.view_r = SignalView(self.canvas_r, self.ax_r[0], self.ax_r[1], COLOR_SPEC, COLOR_SUBTEXT)
@@ -0,0 +1,168 @@
+"""
+Per-stage timers and event counters for the DSP / training / inference pipeline.
+
+Disabled by default; enable with the BIO_INSTRUMENT=1 environment variable or
+`metrics.enable()`. When disabled, `metrics.stage()` returns a shared no-op context
+manager and `metrics.count()` returns immediately, so the hooks can stay in hot paths.
+
+    from instrumentation import metrics
+    with metrics.stage('features.f0'): ...
+    metrics.count('clips_skipped', 'too_short')
+    print(metrics.to_prometheus())
+"""
+import os
+import json
+import time
+import threading
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """
+    Thread-safe registry of stage timings (calls, total and max seconds) and event counts
+    keyed by (event, reason). Snapshots are plain dicts, so worker processes can ship
+    theirs back to the parent for merging.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._timers = {}
+        self._counters = {}
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def stage(self, name):
+        """
+        Context manager timing one execution of stage `name`.
+        """
+        if not self.enabled: return _NULL_STAGE
+        return _Stage(self, name)
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            timer = self._timers.setdefault(name, [0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+
+    def count(self, event, reason="", n=1):
+        """
+        Count an event (e.g. a skipped clip), optionally broken down by reason.
+        """
+        if not self.enabled: return
+        with self._lock:
+            key = (event, reason)
+            self._counters[key] = self._counters.get(key, 0) + n
+
+    def _snapshot(self):
+        return {
+            'timers': {name: {'calls': c, 'total_s': t, 'max_s': m} for name, (c, t, m) in self._timers.items()},
+            'counters': [{'event': e, 'reason': r, 'count': n} for (e, r), n in self._counters.items()]
+        }
+
+    def snapshot(self):
+        with self._lock:
+            return self._snapshot()
+
+    def reset(self):
+        with self._lock:
+            self._timers = {}
+            self._counters = {}
+
+    def drain(self):
+        """
+        Return a snapshot and reset, atomically (used by worker processes per task).
+        """
+        with self._lock:
+            snap = self._snapshot()
+            self._timers = {}
+            self._counters = {}
+        return snap
+
+    def merge(self, snap):
+        """
+        Add a snapshot (e.g. from a worker process) into this registry.
+        """
+        if not snap: return
+        with self._lock:
+            for name, t in snap['timers'].items():
+                timer = self._timers.setdefault(name, [0, 0.0, 0.0])
+                timer[0] += t['calls']
+                timer[1] += t['total_s']
+                timer[2] = max(timer[2], t['max_s'])
+            for c in snap['counters']:
+                key = (c['event'], c['reason'])
+                self._counters[key] = self._counters.get(key, 0) + c['count']
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix="bioacoustic"):
+        snap = self.snapshot()
+        lines = [f"# TYPE {prefix}_stage_calls_total counter",
+                 f"# TYPE {prefix}_stage_seconds_total counter",
+                 f"# TYPE {prefix}_stage_seconds_max gauge"]
+        for name, t in sorted(snap['timers'].items()):
+            label = f'{{stage="{name}"}}'
+            lines.append(f"{prefix}_stage_calls_total{label} {t['calls']}")
+            lines.append(f"{prefix}_stage_seconds_total{label} {t['total_s']:.6f}")
+            lines.append(f"{prefix}_stage_seconds_max{label} {t['max_s']:.6f}")
+
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for c in sorted(snap['counters'], key=lambda c: (c['event'], c['reason'])):
+            lines.append(f'{prefix}_events_total{{event="{c["event"]}",reason="{c["reason"]}"}} {c["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        Dump to `path`: Prometheus text for *.prom / *.txt, JSON otherwise.
+        """
+        text = self.to_prometheus() if path.lower().endswith(('.prom', '.txt')) else self.to_json()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def report(self):
+        """
+        Human-readable table of stages (by total time) and event counts.
+        """
+        snap = self.snapshot()
+        lines = [f"{'stage':<28}{'calls':>8}{'total s':>10}{'mean ms':>10}{'max ms':>10}"]
+        for name, t in sorted(snap['timers'].items(), key=lambda item: -item[1]['total_s']):
+            lines.append(f"{name:<28}{t['calls']:>8}{t['total_s']:>10.3f}"
+                         f"{t['total_s'] * 1000 / max(1, t['calls']):>10.2f}{t['max_s'] * 1000:>10.2f}")
+        for c in sorted(snap['counters'], key=lambda c: (c['event'], c['reason'])):
+            lines.append(f"{c['event']}{'[' + c['reason'] + ']' if c['reason'] else ''}: {c['count']}")
+        return "\n".join(lines)
+
+
+metrics = Metrics(enabled=os.environ.get("BIO_INSTRUMENT", "") not in ("", "0"))
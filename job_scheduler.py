@@ -0,0 +1,167 @@
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a job (from Job.check or a progress report) once it has been cancelled.
+    """
+
+
+class Job:
+    """
+    Handle for one scheduled task. The task function receives the Job itself, so long
+    work can report progress and stop cooperatively when cancelled.
+    """
+
+    def __init__(self, scheduler, key, on_done=None, on_error=None, on_progress=None, on_cancelled=None,
+                 progress_interval=0.1):
+        self.key = key
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancelled = on_cancelled
+        self.progress_interval = progress_interval
+        self.future = None
+        self._scheduler = scheduler
+        self._cancelled = threading.Event()
+        self._last_progress = 0.0
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        # A queued job still starts, sees the flag and stops at once, so on_cancelled always fires
+        self._cancelled.set()
+
+    def check(self):
+        if self.cancelled: raise JobCancelled(self.key)
+
+    def progress(self, *args):
+        """
+        Report progress from the worker; forwarded to on_progress on the Tk thread at most
+        once per progress_interval so a fast loop cannot flood the event queue.
+        Raises JobCancelled if the job was cancelled, which makes every progress hook a
+        cancellation point.
+        """
+        self.check()
+        now = time.monotonic()
+        if self.on_progress is None or now - self._last_progress < self.progress_interval: return
+        self._last_progress = now
+        self._scheduler.post(self._deliver, self.on_progress, *args)
+
+    def _deliver(self, callback, *args):
+        # Drop callbacks of jobs cancelled after they were queued
+        if not self.cancelled: callback(*args)
+
+
+class JobScheduler:
+    """
+    Runs blocking engine calls on a small thread pool and hands their results back to the
+    Tk main thread. Workers never touch widgets: callbacks are queued and drained by a
+    periodic `after()` poll, so the event loop stays responsive during long jobs.
+
+    Jobs are keyed; submitting a key that is still queued or running is coalesced:
+    'drop' keeps the running job and ignores the new request (repeated clicks),
+    'replace' cancels the old job in favour of the new one (e.g. a newer file to analyze).
+    """
+
+    def __init__(self, root, n_workers=2, poll_ms=30, max_callbacks=50):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.max_callbacks = max_callbacks
+        self._executor = ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="job")
+        self._callbacks = queue.Queue()
+        self._jobs = {}
+        # Every job not yet finished, including cancelled ones a 'replace' submit superseded
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.root.after(self.poll_ms, self._poll)
+
+    def submit(self, key, fn, on_done=None, on_error=None, on_progress=None, on_cancelled=None, coalesce='drop'):
+        """
+        Schedule fn(job) on a worker. on_done(result), on_error(exception) and
+        on_progress(*args) are called on the Tk thread; once a cancelled job has actually
+        stopped, on_cancelled() is called instead. Returns the active Job for `key`.
+        """
+        with self._lock:
+            active = self._jobs.get(key)
+            if active is not None and not active.cancelled:
+                if coalesce == 'drop': return active
+                active.cancel()
+
+            job = Job(self, key, on_done, on_error, on_progress, on_cancelled)
+            self._jobs[key] = job
+            self._pending.add(job)
+            job.future = self._executor.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job, fn):
+        try:
+            job.check()
+            result = fn(job)
+            if job.on_done is not None: self.post(job._deliver, job.on_done, result)
+        except JobCancelled:
+            pass
+        except Exception as e:
+            if job.on_error is not None:
+                self.post(job._deliver, job.on_error, e)
+            else:
+                print(f"[Job Error] {job.key}: {e}")
+        finally:
+            with self._lock:
+                if self._jobs.get(job.key) is job: del self._jobs[job.key]
+                self._pending.discard(job)
+            if job.cancelled and job.on_cancelled is not None: self.post(job.on_cancelled)
+
+    def post(self, callback, *args):
+        """
+        Queue callback(*args) to run on the Tk thread (safe to call from any thread).
+        """
+        self._callbacks.put((callback, args))
+
+    def _poll(self):
+        # Bounded drain per tick keeps redraws and input handling interleaved
+        for _ in range(self.max_callbacks):
+            try:
+                callback, args = self._callbacks.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"[Job Callback Error] {e}")
+
+        if not self._closed: self.root.after(self.poll_ms, self._poll)
+
+    def is_running(self, key):
+        with self._lock:
+            return key in self._jobs
+
+    def cancel(self, key=None):
+        """
+        Cancel the job for `key`, or every job if no key is given.
+        """
+        with self._lock:
+            jobs = list(self._jobs.values()) if key is None else [self._jobs[key]] if key in self._jobs else []
+        for job in jobs: job.cancel()
+        return len(jobs)
+
+    def wait(self, *keys):
+        """
+        Block until the jobs for `keys` (queued or running) have finished. Call it from a
+        job, never from the Tk thread. Cancelling only stops a job at its next check(), so
+        this is how a job waits for the ones it must not overlap with.
+        """
+        with self._lock:
+            futures = [job.future for job in self._pending if job.key in keys]
+        wait(futures)
+
+    def shutdown(self):
+        self._closed = True
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,5 +1,8 @@
+import multiprocessing
 from gui_app import BioTranslatorApp
 
 if __name__ == "__main__":
+    # Required for the process-pooled corpus scan in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     app = BioTranslatorApp()
     app.mainloop()
\ No newline at end of file
@@ -1,126 +1,411 @@
 import os
+import shutil
+import random
+import numpy as np
 import pandas as pd
-import librosa
-import joblib
-import zlib
-from sklearn.ensemble import RandomForestClassifier
 from dsp_core import DSPCore
 from data_manager import DataManager
+from feature_cache import FeatureCache
+from audio_io import load_audio
+from checkpoint import CheckpointError, MANIFEST_NAME, save_checkpoint, load_checkpoint, update_checkpoint_model
+from synth_pool import SynthesisPool
+from template_index import TemplateIndex
+from feature_store import FeatureStore
+from similarity_index import SimilarityIndex
+from instrumentation import metrics
+
+LABEL_COLS = ['Species', 'Context', 'Emotion']
+
+# Monolithic pickle written by earlier versions; no longer loadable (pre-versioned features)
+LEGACY_MODEL_FILE = "bio_translator_model.pkl"
+
+
+def _new_forest():
+    # Imported here so loading a checkpoint (LazyModel) or importing this module stays sklearn-free
+    from sklearn.ensemble import RandomForestClassifier
+    # n_jobs=-1 builds the trees on every core; fit_classifiers resets it to 1 for prediction
+    return RandomForestClassifier(n_estimators=100, n_jobs=-1)
 
 
 class ModelEngine:
-    def __init__(self, data_path="SoundsDatabase"):
-        self.dsp = DSPCore()
-        self.data_mgr = DataManager(data_path)
-        self.model_file = "bio_translator_model.pkl"
+    def __init__(self, data_path="SoundsDatabase", n_workers=None, model_type="separate", f0_backend="yin",
+                 f0_range=None):
+        # See DSPCore.F0_BACKENDS / DSPCore.species_f0_range; part of the feature version
+        self.dsp = DSPCore(f0_backend=f0_backend, f0_range=f0_range)
+        # n_workers=None lets the corpus scan use every available core
+        self.data_mgr = DataManager(data_path, n_workers=n_workers)
+        self.checkpoint_dir = "bio_translator_model"
+        # Per-file features survive retrains, so a rescan only touches new/changed files
+        self.feature_cache = FeatureCache("feature_cache.pkl", self.dsp.feature_version)
+        # Columnar, memory-mapped copy of the last scanned training table
+        self.feature_store = FeatureStore("feature_store")
 
-        self.clf_species = RandomForestClassifier(n_estimators=100)
-        self.clf_context = RandomForestClassifier(n_estimators=100)
-        self.clf_emotion = RandomForestClassifier(n_estimators=100)
+        # "separate": one forest per label; "fused": a single multi-output forest for all three
+        if model_type not in ("separate", "fused"): raise ValueError(f"Unknown model_type: {model_type}")
+        self.model_type = model_type
+        # Fresh forests are created by fit_classifiers; a checkpoint load sets LazyModels instead
+        self.clf_species = None
+        self.clf_context = None
+        self.clf_emotion = None
+        self.clf_fused = None
 
+        # Per-group template candidates, sorted by centroid; also survives retrains
+        self.template_index = TemplateIndex("template_index.pkl")
+        # Nearest-neighbour index over all recordings' features, saved with the checkpoint
+        self.similarity_index = None
         # Stores the chosen template path for each (Species, Context) pair
         self.template_db = {}
         self.feature_cols = []
         self.is_trained = False
+        # Human-readable reason why the checkpoint could not be used, if any
+        self.load_error = None
+        # Pre-rendered synthesis variants, rebuilt whenever template_db changes
+        self.synth_pool = None
 
-    def initialize_system(self):
-        # 1. Attempt to load cached model
-        if os.path.exists(self.model_file):
-            print("[System] Loading cache...")
+    def initialize_system(self, progress=None):
+        """
+        Load the checkpoint, or scan the corpus and train if there is none.
+        `progress(done, total)` is forwarded to the corpus scan (see DataManager.scan_folder).
+        Returns the template_db, or None if there is nothing usable.
+        """
+        self.load_error = None
+        self._reset_synth_pool()
+
+        # 1. Attempt to load the checkpoint; models are read lazily on first prediction
+        if os.path.exists(os.path.join(self.checkpoint_dir, MANIFEST_NAME)):
+            print("[System] Loading checkpoint...")
             try:
-                ckpt = joblib.load(self.model_file)
-                self.clf_species = ckpt['clf_species']
-                self.clf_context = ckpt['clf_context']
-                self.clf_emotion = ckpt['clf_emotion']
-                self.template_db = ckpt['template_db']
-                self.feature_cols = ckpt['feature_cols']
-                self.is_trained = True
+                with metrics.stage('checkpoint.load'):
+                    self._load_checkpoint()
                 return self.template_db
-            except:
-                print("Cache corrupted. Retraining...")
+            except CheckpointError as e:
+                # Report instead of silently starting a multi-hour retrain
+                self.load_error = f"Checkpoint not usable: {e}"
+                print(f"[System] {self.load_error}")
+                return None
+
+        if os.path.exists(LEGACY_MODEL_FILE):
+            self.load_error = (f"Found legacy checkpoint {LEGACY_MODEL_FILE}, trained on outdated features. "
+                               f"A retrain is required.")
+            print(f"[System] {self.load_error}")
+            return None
 
         # 2. Full scan if no cache
         print("[System] Scanning audio files...")
-        df = self.data_mgr.scan_folder(self.dsp)
+        # Only if the template index was synced after the cache was last saved (an interrupted
+        # run leaves it behind) can the rows featurized by this scan be inserted incrementally
+        incremental = self._template_index_current()
+        self.feature_cache.load()
+        try:
+            with metrics.stage('train.scan'):
+                df = self.data_mgr.scan_folder(self.dsp, cache=self.feature_cache, progress=progress)
+        finally:
+            # Keep the files featurized so far even if the scan was cancelled
+            self.feature_cache.save()
         if df.empty: return None
 
-        self.feature_cols = [c for c in df.columns if c.startswith('mfcc') or c.endswith('_mean') or c == 'duration']
+        # Persist the table column-wise; training below reads the memory-mapped store
+        with metrics.stage('train.feature_store'):
+            self.feature_store.write(df, self.dsp.FEATURE_NAMES, self.dsp.feature_version)
+        del df
+        self.train_from_store(self.feature_store, changed=set(self.data_mgr.scan_changed) if incremental else None)
+
+        return self.template_db
+
+    def _template_index_current(self):
+        try:
+            return os.path.getmtime(self.template_index.index_file) >= os.path.getmtime(self.feature_cache.cache_file)
+        except OSError:
+            return False
+
+    def train_from_shards(self, shard_root):
+        """
+        Merge the partial feature stores of a sharded scan (DataManager.scan_shard, one per
+        node) into self.feature_store and train from it. Paths are rebased onto this
+        engine's data folder. Returns the template_db, or None if the shards hold no rows.
+        """
+        self.load_error = None
+        self._reset_synth_pool()
+        with metrics.stage('train.merge_shards'):
+            self.feature_store.merge_shards(shard_root, self.dsp.feature_version, self.data_mgr.data_folder)
+        if not len(self.feature_store): return None
+        self.train_from_store(self.feature_store)
+        return self.template_db
+
+    def train_from_store(self, store, changed=None):
+        """
+        Select templates and fit the classifiers from a loaded FeatureStore, then save the checkpoint.
+        `changed`: paths featurized since the template index was last synced (see TemplateIndex.sync).
+        """
+        self.feature_cols = list(store.feature_names)
 
         # 3. Semantic Hash Anchoring
-        # Selects a deterministic template based on the spectral centroid distribution
+        # Selects a deterministic template based on the spectral centroid distribution.
+        # Only groups whose files changed since the last scan are updated.
         print("[System] Selecting templates via Semantic Hashing...")
-        self.template_db = {}
-
-        grouped = df.groupby(['Species', 'Context'])
+        with metrics.stage('train.templates'):
+            self.template_index.load()
+            rebuilt = self.template_index.sync(store.to_frame(), self.feature_cols, changed=changed)
+            self.template_index.save()
+        print(f"[System] Template index: {rebuilt}/{len(self.template_index.groups)} groups updated.")
+        self.template_db = self.template_index.anchors()
 
-        for key, group in grouped:
-            # key: ('Horse', 'GroupReunion')
-            context_name = str(key[1])
+        # 4. Train Random Forest Classifiers on the float32 matrix (no copy unless NaNs must be filled)
+        X = store.features
+        if np.isnan(X).any(): X = np.nan_to_num(X)
+        with metrics.stage('train.fit'):
+            self.fit_classifiers(pd.DataFrame(X, columns=self.feature_cols, copy=False), store.label_frame())
 
-            if len(group) == 1:
-                self.template_db[key] = group.iloc[0]['Filepath']
-                continue
+        # 5. "Find similar recordings" index over the same feature vectors
+        with metrics.stage('train.similarity_index'):
+            self.similarity_index = SimilarityIndex().build(X, store.paths)
 
-            # Sort group by brightness (Spectral Centroid)
-            sorted_group = group.sort_values(by='centroid_mean')
+        self.is_trained = True
 
-            # Map context string to a percentage (0-99)
-            hash_val = zlib.crc32(context_name.encode('utf-8')) % 100
+        # Save checkpoint
+        with metrics.stage('train.checkpoint_save'):
+            save_checkpoint(self.checkpoint_dir, {**self.classifiers(), 'similarity_index': self.similarity_index}, {
+                'feature_version': self.dsp.feature_version,
+                'model_type': self.model_type,
+                'feature_cols': self.feature_cols,
+                'template_db': [[sp, ctx, path] for (sp, ctx), path in self.template_db.items()]
+            })
 
-            # Select the sample at the hashed position
-            target_idx = int((hash_val / 100.0) * (len(group) - 1))
-            best_filepath = sorted_group.iloc[target_idx]['Filepath']
+    def _load_checkpoint(self):
+        manifest, models = load_checkpoint(self.checkpoint_dir, self.dsp.feature_version)
 
-            self.template_db[key] = best_filepath
+        try:
+            model_type = manifest['model_type']
+            template_db = {(sp, ctx): path for sp, ctx, path in manifest['template_db']}
+            feature_cols = list(manifest['feature_cols'])
+        except (KeyError, TypeError, ValueError) as e:
+            raise CheckpointError(f"Malformed manifest ({type(e).__name__}: {e}).")
 
-        # 4. Train Random Forest Classifiers
-        X = df[self.feature_cols].fillna(0)
-        self.clf_species.fit(X, df['Species'])
-        self.clf_context.fit(X, df['Context'])
-        self.clf_emotion.fit(X, df['Emotion'])
+        self.model_type = model_type
+        # Checkpoints written before the similarity index existed simply lack it
+        self.similarity_index = models.pop('similarity_index', None)
+        if set(models) != set(self.classifiers()):
+            raise CheckpointError(f"Checkpoint models {sorted(models)} do not match model type '{model_type}'.")
 
+        for name, model in models.items(): setattr(self, name, model)
+        self.template_db = template_db
+        self.feature_cols = feature_cols
         self.is_trained = True
 
-        # Save cache
-        joblib.dump({
-            'clf_species': self.clf_species,
-            'clf_context': self.clf_context,
-            'clf_emotion': self.clf_emotion,
-            'template_db': self.template_db,
-            'feature_cols': self.feature_cols
-        }, self.model_file)
+    def load_models(self):
+        """
+        Force lazily-loaded models into memory (e.g. from a background thread after startup).
+        """
+        with metrics.stage('checkpoint.load_models'):
+            for model in self.classifiers().values():
+                if hasattr(model, 'load'): model.load()
 
-        return self.template_db
+    def force_retrain(self, progress=None):
+        shutil.rmtree(self.checkpoint_dir, ignore_errors=True)
+        if os.path.exists(LEGACY_MODEL_FILE): os.remove(LEGACY_MODEL_FILE)
+        self.is_trained = False
+        return self.initialize_system(progress=progress)
+
+    def _feature_matrix(self, feats):
+        """
+        Align a feature table (DataFrame or list of dicts) to the trained feature columns.
+        """
+        df_in = feats if isinstance(feats, pd.DataFrame) else pd.DataFrame(feats)
+        return df_in.reindex(columns=self.feature_cols, fill_value=0).fillna(0)
+
+    def classifiers(self):
+        """
+        The trained estimators of the active model_type, keyed by checkpoint name.
+        """
+        if self.model_type == 'fused':
+            return {'clf_fused': self.clf_fused}
+        return {'clf_species': self.clf_species, 'clf_context': self.clf_context, 'clf_emotion': self.clf_emotion}
+
+    def fit_classifiers(self, X, labels):
+        """
+        Fit the classifiers on feature matrix X and a label table with LABEL_COLS columns.
+        """
+        models = {name: _new_forest() for name in self.classifiers()}
+        if self.model_type == 'fused':
+            # Object dtype keeps sklearn from truncating labels to the first output's string width
+            models['clf_fused'].fit(X, labels[LABEL_COLS].to_numpy(dtype=object))
+        else:
+            for name, col in (('clf_species', 'Species'), ('clf_context', 'Context'), ('clf_emotion', 'Emotion')):
+                models[name].fit(X, labels[col])
+
+        # Predictions are mostly single rows (predict_audio, streaming, server micro-batches),
+        # where dispatching to a pool on every core costs far more than the trees themselves
+        for model in models.values(): model.set_params(n_jobs=1)
+        # Installed only once all are fitted, so a concurrent predict never sees an unfitted model
+        for name, model in models.items(): setattr(self, name, model)
 
-    def force_retrain(self):
-        if os.path.exists(self.model_file): os.remove(self.model_file)
-        return self.initialize_system()
+    def _predict_labels(self, X):
+        """
+        Predict all three labels over the whole feature matrix, with one pass of the fused
+        forest or one call per classifier.
+        """
+        if self.model_type == 'fused':
+            pred = self.clf_fused.predict(X)
+            return pred[:, 0], pred[:, 1], pred[:, 2]
+        return self.clf_species.predict(X), self.clf_context.predict(X), self.clf_emotion.predict(X)
+
+    def classify_features(self, feats):
+        """
+        Classify already-extracted features (DataFrame or list of dicts).
+        Returns (species, context, emotion) label arrays, one entry per row.
+        """
+        with metrics.stage('predict.classify'):
+            return self._predict_labels(self._feature_matrix(feats))
 
     def predict_audio(self, filepath):
         if not self.is_trained: return {'Error': 'Model not trained'}
-        y, sr = librosa.load(filepath, sr=self.dsp.sr)
-        feats = self.dsp.extract_features(y, sr)
+        with metrics.stage('predict.decode'):
+            y, sr = load_audio(filepath, sr=self.dsp.sr)
+        with metrics.stage('predict.features'):
+            feats = self.dsp.extract_features(y, sr)
         if not feats: return None
 
-        df_in = pd.DataFrame([feats])
-        for col in self.feature_cols:
-            if col not in df_in.columns: df_in[col] = 0
-        df_in = df_in[self.feature_cols]
+        species, context, emotion = self.classify_features([feats])
 
         return {
-            'Species': self.clf_species.predict(df_in)[0],
-            'Context': self.clf_context.predict(df_in)[0],
-            'Emotion': self.clf_emotion.predict(df_in)[0],
+            'Species': species[0],
+            'Context': context[0],
+            'Emotion': emotion[0],
             'Features': feats,
             'Audio': y, 'SR': sr
         }
 
-    def generate_audio(self, sp, ctx):
+    def iter_predictions(self, filepaths, n_workers=None, batch_size=256, chunksize=32):
+        """
+        Batch inference over many files.
+        Files are decoded and featurized in parallel (see DataManager.featurize_files), then
+        classified `batch_size` at a time with one predict pass over each batch.
+        Yields one DataFrame per batch with Filepath, Species, Context, Emotion, Error and features.
+        """
+        if not self.is_trained: raise RuntimeError("Model not trained")
+
+        batch = []
+        stream = self.data_mgr.featurize_files(list(filepaths), self.dsp, n_workers=n_workers, chunksize=chunksize)
+        for item in stream:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield self._classify_batch(batch)
+                batch = []
+        if batch: yield self._classify_batch(batch)
+
+    def _classify_batch(self, batch):
+        out = pd.DataFrame({'Filepath': [path for path, _, _ in batch]})
+        for col in LABEL_COLS: out[col] = ''
+        out['Error'] = [failure['Error'] if failure else ('' if feats else 'Clip too short')
+                        for _, feats, failure in batch]
+
+        valid = [i for i, (_, feats, _) in enumerate(batch) if feats]
+        feats_df = pd.DataFrame([batch[i][1] for i in valid], index=valid)
+        if valid:
+            species, context, emotion = self.classify_features(feats_df)
+            out.loc[valid, 'Species'] = species
+            out.loc[valid, 'Context'] = context
+            out.loc[valid, 'Emotion'] = emotion
+
+        return out.join(feats_df.reindex(columns=self.feature_cols))
+
+    def predict_many(self, filepaths, n_workers=None, batch_size=256):
+        """
+        Classify many files at once. Returns a single DataFrame (see iter_predictions).
+        """
+        frames = list(self.iter_predictions(filepaths, n_workers=n_workers, batch_size=batch_size))
+        if not frames: return pd.DataFrame(columns=['Filepath', 'Species', 'Context', 'Emotion', 'Error'])
+        return pd.concat(frames, ignore_index=True)
+
+    def _reset_synth_pool(self):
+        if self.synth_pool is not None: self.synth_pool.shutdown()
+        self.synth_pool = None
+
+    def prefill_synthesis(self, pool_size=3):
+        """
+        Start pre-rendering synthesis variants for every (Species, Context) in the background.
+        """
+        if self.synth_pool is None:
+            self.synth_pool = SynthesisPool(self.dsp, self.template_db, pool_size=pool_size)
+        self.synth_pool.prefill()
+
+    def find_templates(self, sp, ctx, centroid=None, f0=None, k=5):
+        """
+        Paths of the k recordings of (sp, ctx) nearest to a target centroid and/or F0
+        (default: the anchor template's neighbours). The index is read on first use.
+        """
+        if not self.template_index.groups: self.template_index.load()
+        return self.template_index.nearest((sp, ctx), centroid=centroid, f0=f0, k=k)
+
+    def _similarity(self):
+        """
+        The loaded similarity index. For a checkpoint without one it is built from the
+        feature store, if that holds the same features.
+        """
+        if self.similarity_index is None:
+            try:
+                self.feature_store.load(self.dsp.feature_version)
+            except ValueError as e:
+                raise RuntimeError(f"No similarity index in the checkpoint and no usable feature store ({e}); "
+                                   f"retrain to build one.")
+            with metrics.stage('train.similarity_index'):
+                self.similarity_index = SimilarityIndex().build(np.nan_to_num(self.feature_store.features),
+                                                                self.feature_store.paths)
+        # A checkpointed index is read (memory-mapped) on first use, like the classifiers
+        if hasattr(self.similarity_index, 'load'): self.similarity_index = self.similarity_index.load()
+        return self.similarity_index
+
+    def find_similar(self, query, k=20, exact=False, n_probe=None):
+        """
+        The k indexed recordings most similar to `query`: an audio file path, or a features
+        dict such as predict_audio()['Features']. Returns [(path, distance), ...], nearest
+        first (distance in standardized feature space). exact=True scans every recording
+        instead of the nearest index cells, for validating the approximate results.
+        """
+        if not self.is_trained: raise RuntimeError("Model not trained")
+        if isinstance(query, str):
+            with metrics.stage('predict.decode'):
+                y, sr = load_audio(query, sr=self.dsp.sr)
+            with metrics.stage('predict.features'):
+                query = self.dsp.extract_features(y, sr)
+            if not query: return []
+
+        index = self._similarity()
+        with metrics.stage('predict.similar'):
+            return index.search(self._feature_matrix([query]).to_numpy(dtype=np.float32)[0], k=k,
+                                n_probe=n_probe, exact=exact)
+
+    def index_recordings(self, filepaths, n_workers=None):
+        """
+        Featurize new recordings and insert them into the similarity index (without
+        retraining the classifiers); the index file in the checkpoint is updated.
+        Returns the number of recordings added.
+        """
+        if not self.is_trained: raise RuntimeError("Model not trained")
+        # The checkpointed index is memory-mapped from the file about to be replaced; copy it
+        # into memory first (os.replace fails on a mapped file on Windows)
+        index = self._similarity().in_memory()
+        rows = [(path, feats) for path, feats, _ in self.data_mgr.featurize_files(list(filepaths), self.dsp,
+                                                                                 n_workers=n_workers) if feats]
+        if not rows: return 0
+
+        X = self._feature_matrix([feats for _, feats in rows]).to_numpy(dtype=np.float32)
+        index.add(X, [path for path, _ in rows])
+        update_checkpoint_model(self.checkpoint_dir, 'similarity_index', index)
+        return len(rows)
+
+    def generate_audio(self, sp, ctx, variety=1):
         """
         Reverse Synthesis Entry Point.
-        Retrieves the template and applies DSP augmentation.
+        Takes a pre-rendered variant of the template from the synthesis pool
+        (rendered on demand if the pool for this key is empty).
+        With variety > 1 the source is drawn from the `variety` recordings nearest to the
+        anchor, trading the pool's instant response for more varied output.
         """
-        key = (sp, ctx)
-        template_path = self.template_db.get(key)
-        if not template_path: return None, None
-        return self.dsp.variate_sample(template_path)
\ No newline at end of file
+        if variety > 1:
+            candidates = self.find_templates(sp, ctx, k=variety)
+            if candidates: return self.dsp.variate_sample(random.choice(candidates))
+
+        if self.synth_pool is None:
+            self.synth_pool = SynthesisPool(self.dsp, self.template_db)
+        return self.synth_pool.get((sp, ctx))
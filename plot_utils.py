@@ -0,0 +1,149 @@
+import math
+import numpy as np
+from scipy import signal
+
+
+def minmax_envelope(y, sr, n_bins):
+    """
+    Decimate a signal for display: one (min, max) pair per horizontal pixel.
+    Returns (times, values) with 2 * n_bins points, or the raw samples if the
+    signal is already shorter than that.
+    """
+    n = len(y)
+    if n <= 2 * n_bins:
+        return np.arange(n) / sr, y
+
+    edges = np.linspace(0, n, n_bins + 1).astype(int)
+    lo = np.minimum.reduceat(y, edges[:-1])
+    hi = np.maximum.reduceat(y, edges[:-1])
+
+    # Each pixel column becomes a vertical stroke from its minimum to its maximum
+    t = np.column_stack([edges[:-1], edges[1:] - 1]).ravel() / sr
+    return t, np.column_stack([lo, hi]).ravel()
+
+
+def band_spectrum(y, sr, fmax=4000.0, n_fft=4096, max_segments=64):
+    """
+    Welch-averaged magnitude spectrum, cropped to 0..fmax Hz.
+    At most max_segments evenly spaced n_fft-sample segments are averaged, and they are
+    low-passed and decimated to about 2.5 * fmax before the FFT (keeping the frequency
+    resolution of n_fft at the original rate), so the cost is bounded for any clip length.
+    """
+    q = max(1, int(sr // (2.5 * fmax)))
+    seg = min(n_fft, len(y))
+    # Welch with 50% overlap would average about 2 * len(y) / seg segments
+    if 2 * len(y) // seg - 1 > max_segments:
+        starts = np.linspace(0, len(y) - seg, max_segments).astype(int)
+        y = y[starts[:, None] + np.arange(seg)]
+    if q > 1:
+        y = signal.resample_poly(y, 1, q, axis=-1)
+        sr = sr / q
+    freqs, power = signal.welch(y, sr, nperseg=min(max(1, seg // q), y.shape[-1]), scaling='spectrum', axis=-1)
+    power = power.reshape(-1, len(freqs)).mean(axis=0)
+    band = freqs <= fmax
+    return freqs[band], np.sqrt(power[band])
+
+
+def nice_ceil(x):
+    """
+    Smallest value of the 1-2-5 series (..., 0.5, 1, 2, 5, 10, ...) that is >= x.
+    """
+    step = 10.0 ** math.floor(math.log10(x))
+    return next(m * step for m in (1, 2, 5, 10) if m * step >= x)
+
+
+class SignalView:
+    """
+    Waveform + spectrum pair drawn into two existing axes.
+    The Line2D artists are created once and updated with set_data, the waveform is
+    decimated to the axes' pixel width (and re-decimated from the cached signal when
+    the canvas is resized), and the spectrum is computed once per signal.
+    Axes limits are fixed (amplitude -1..1, spectrum 0..fmax scaled to its peak, time
+    rounded up to the 1-2-5 series), so a new signal usually only redraws the two line
+    artists, blitted over the background cached at the last full draw. A full draw
+    happens on the first show, on resize, and when the time axis or a title changes.
+    """
+
+    def __init__(self, canvas, ax_wave, ax_spec, color, title_color, fmax=4000.0):
+        self.canvas = canvas
+        self.ax_wave = ax_wave
+        self.ax_spec = ax_spec
+        self.fmax = fmax
+        self._y = None
+        self._sr = None
+        self._spectrum = None
+        self._background = None
+
+        # Animated artists are left out of full draws and blitted on top of the background
+        self.wave_line, = ax_wave.plot([], [], color=color, lw=0.8, animated=True)
+        self.spec_line, = ax_spec.plot([], [], color=color, lw=0.8, animated=True)
+
+        for ax, xlabel, ylabel in ((ax_wave, "Time (s)", "Amplitude"),
+                                   (ax_spec, "Frequency (Hz)", "Relative Magnitude")):
+            ax.set_xlabel(xlabel, fontsize=8)
+            ax.set_ylabel(ylabel, fontsize=8)
+            ax.tick_params(axis='both', which='major', labelsize=8)
+            ax.grid(True, alpha=0.3, linestyle='--')
+            ax.title.set_color(title_color)
+            ax.title.set_fontsize(9)
+        ax_wave.set_xlim(0, 1)
+        ax_wave.set_ylim(-1.05, 1.05)
+        ax_spec.set_xlim(0, fmax)
+        ax_spec.set_ylim(0, 1.05)
+
+        canvas.mpl_connect('draw_event', self._on_draw)
+        canvas.mpl_connect('resize_event', self._on_resize)
+
+    def _pixel_width(self):
+        return max(1, int(self.ax_wave.get_window_extent().width))
+
+    def _update_waveform(self):
+        t, env = minmax_envelope(self._y, self._sr, self._pixel_width())
+        self.wave_line.set_data(t, env)
+
+    def _set_title(self, ax, title):
+        if ax.get_title() == title: return False
+        ax.set_title(title, pad=5)
+        return True
+
+    def show(self, y, sr, wave_title, spec_title):
+        if len(y) == 0: return
+        # Re-showing the same signal (e.g. after a title change) reuses its spectrum
+        if self._spectrum is None or y is not self._y or sr != self._sr:
+            freqs, mag = band_spectrum(y, sr, fmax=self.fmax)
+            self._spectrum = freqs, mag / (float(mag.max()) or 1.0)
+        self._y, self._sr = y, sr
+
+        layout_changed = self._set_title(self.ax_wave, wave_title) | self._set_title(self.ax_spec, spec_title)
+        t_max = nice_ceil(len(y) / sr)
+        if self.ax_wave.get_xlim()[1] != t_max:
+            self.ax_wave.set_xlim(0, t_max)
+            layout_changed = True
+
+        self._update_waveform()
+        self.spec_line.set_data(*self._spectrum)
+
+        if layout_changed or self._background is None:
+            self.canvas.draw()
+        else:
+            self._blit()
+
+    def _blit(self):
+        self.canvas.restore_region(self._background)
+        self._draw_lines()
+        for ax in (self.ax_wave, self.ax_spec):
+            self.canvas.blit(ax.bbox)
+
+    def _draw_lines(self):
+        self.ax_wave.draw_artist(self.wave_line)
+        self.ax_spec.draw_artist(self.spec_line)
+
+    def _on_draw(self, event):
+        # Every full draw refreshes the cached background, then adds the lines it skipped
+        self._background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._draw_lines()
+
+    def _on_resize(self, event):
+        if self._y is not None:
+            self._update_waveform()
+            self.canvas.draw_idle()
@@ -0,0 +1,331 @@
+"""
+Headless HTTP inference service (asyncio, standard library only).
+
+Usage:
+    python server.py [--host 127.0.0.1] [--port 8000] [--workers 4] [--data SoundsDatabase]
+
+Endpoints:
+    POST /predict   body: WAV bytes, or JSON {"path": "recording.wav"}  -> JSON labels + features
+    POST /generate  body: JSON {"species": ..., "context": ...}         -> audio/wav
+    GET  /generate?species=...&context=...                              -> audio/wav
+    GET  /metrics   request counts, latency percentiles, batch sizes, throughput
+                    (?format=prometheus for the pipeline stage metrics as Prometheus text)
+    GET  /health
+
+The engine is loaded once. Uploaded/referenced audio is decoded and featurized in a
+process pool, and concurrent /predict requests are micro-batched into a single
+classifier call. --port 0 picks a free port (printed on startup).
+"""
+import argparse
+import asyncio
+import collections
+import io
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+from scipy.io import wavfile
+from audio_io import load_audio
+from model_engine import ModelEngine
+from instrumentation import metrics
+
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+
+def _featurize_request(source, payload, dsp_instance, instrument):
+    """
+    Process-pool task: decode a path or in-memory audio file and extract its features
+    with the engine's DSPCore configuration. Returns (features, metrics snapshot of this task).
+    """
+    metrics.enable(instrument)
+
+    with metrics.stage('decode'):
+        # Uploads are decoded and resampled by the same AudioReader as files and the training corpus
+        y, sr = load_audio(payload if source == 'path' else io.BytesIO(payload), sr=dsp_instance.sr)
+    return dsp_instance.extract_features(y, sr), metrics.drain()
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class LatencyStats:
+    """
+    Request count, error count and a rolling window of latencies for one endpoint.
+    """
+
+    def __init__(self, window=2048):
+        self.count = 0
+        self.errors = 0
+        self.latencies = collections.deque(maxlen=window)
+
+    def record(self, seconds, ok=True):
+        self.count += 1
+        if not ok: self.errors += 1
+        self.latencies.append(seconds)
+
+    def summary(self):
+        out = {'count': self.count, 'errors': self.errors}
+        if self.latencies:
+            ms = np.array(self.latencies) * 1000
+            out.update({'mean_ms': float(ms.mean()), 'p50_ms': float(np.percentile(ms, 50)),
+                        'p95_ms': float(np.percentile(ms, 95)), 'p99_ms': float(np.percentile(ms, 99))})
+        return out
+
+
+class InferenceServer:
+    """
+    asyncio HTTP front-end for a trained ModelEngine.
+    Featurization runs in `n_workers` processes; classification runs on one dedicated
+    thread, fed by a batcher that collects up to `max_batch` pending requests, waiting
+    at most `max_wait` seconds after the first one arrives.
+    """
+
+    def __init__(self, engine, n_workers=None, max_batch=64, max_wait=0.005):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.n_workers = n_workers
+
+        self.stats = collections.defaultdict(LatencyStats)
+        self.batch_sizes = collections.Counter()
+        self.started = time.monotonic()
+
+        self._pool = None
+        self._classifier = ThreadPoolExecutor(max_workers=1, thread_name_prefix="classify")
+        self._queue = None
+        self._batcher = None
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=8000):
+        """
+        Start listening. Returns the bound port (useful with port=0).
+        """
+        self._pool = ProcessPoolExecutor(max_workers=self.n_workers)
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._batch_loop())
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        self.started = time.monotonic()
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batcher is not None: self._batcher.cancel()
+        if self._pool is not None: self._pool.shutdown(cancel_futures=True)
+        self._classifier.shutdown(wait=False)
+
+    # === Micro-batching ===
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0: break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.batch_sizes[len(batch)] += 1
+            try:
+                species, context, emotion = await loop.run_in_executor(
+                    self._classifier, self.engine.classify_features, [feats for feats, _ in batch])
+                for k, (_, future) in enumerate(batch):
+                    if not future.done(): future.set_result((species[k], context[k], emotion[k]))
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done(): future.set_exception(e)
+
+    async def classify(self, feats):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((feats, future))
+        return await future
+
+    # === Endpoints ===
+    async def predict(self, body, headers):
+        if headers.get('content-type', '').startswith('application/json'):
+            try:
+                path = json.loads(body)['path']
+            except (ValueError, KeyError, TypeError):
+                raise HTTPError(400, 'Expected JSON body {"path": "..."}')
+            source, payload = 'path', path
+        else:
+            if not body: raise HTTPError(400, "Empty request body; send WAV bytes or a JSON path")
+            source, payload = 'bytes', body
+
+        loop = asyncio.get_running_loop()
+        try:
+            feats, snapshot = await loop.run_in_executor(self._pool, _featurize_request, source, payload,
+                                                         self.engine.dsp, metrics.enabled)
+        except Exception as e:
+            metrics.count('files_failed', f"decode:{type(e).__name__}")
+            raise HTTPError(422, f"Cannot decode audio: {e}")
+        metrics.merge(snapshot)
+        if not feats: raise HTTPError(422, "Clip too short or silent")
+
+        species, context, emotion = await self.classify(feats)
+        body = {'Species': species, 'Context': context, 'Emotion': emotion, 'Features': feats}
+        return 200, 'application/json', json.dumps(body, default=float).encode()
+
+    async def generate(self, body, query):
+        params = {k: v[0] for k, v in query.items()}
+        if body:
+            try:
+                parsed = json.loads(body)
+            except ValueError:
+                raise HTTPError(400, "Malformed JSON body")
+            if not isinstance(parsed, dict):
+                raise HTTPError(400, 'Expected JSON object {"species": ..., "context": ...}')
+            params.update(parsed)
+        sp, ctx = params.get('species'), params.get('context')
+        if not sp or not ctx: raise HTTPError(400, "Both 'species' and 'context' are required")
+        if not isinstance(sp, str) or not isinstance(ctx, str):
+            raise HTTPError(400, "'species' and 'context' must be strings")
+
+        wave, sr = await asyncio.get_running_loop().run_in_executor(None, self.engine.generate_audio, sp, ctx)
+        if wave is None: raise HTTPError(404, f"No recording found for [{sp}] in [{ctx}] context")
+
+        buf = io.BytesIO()
+        wavfile.write(buf, sr, np.asarray(wave, dtype=np.float32))
+        return 200, 'audio/wav', buf.getvalue()
+
+    def metrics_report(self, query):
+        if query.get('format', [''])[0] == 'prometheus':
+            return 200, 'text/plain; version=0.0.4', metrics.to_prometheus().encode()
+
+        uptime = time.monotonic() - self.started
+        n_batches = sum(self.batch_sizes.values())
+        n_batched = sum(size * n for size, n in self.batch_sizes.items())
+        body = {
+            'uptime_s': uptime,
+            'endpoints': {name: stats.summary() for name, stats in self.stats.items()},
+            'throughput_rps': sum(s.count for s in self.stats.values()) / max(uptime, 1e-9),
+            'classifier_batches': n_batches,
+            'mean_batch_size': n_batched / n_batches if n_batches else 0.0,
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            # Pipeline stage timings and failure counts (BIO_INSTRUMENT=1), including worker processes
+            'stages': metrics.snapshot() if metrics.enabled else None
+        }
+        return 200, 'application/json', json.dumps(body).encode()
+
+    async def dispatch(self, method, target, headers, body):
+        url = urlsplit(target)
+        route = (method, url.path)
+        if route == ('POST', '/predict'): return await self.predict(body, headers)
+        if route in (('POST', '/generate'), ('GET', '/generate')):
+            return await self.generate(body, parse_qs(url.query))
+        if route == ('GET', '/metrics'): return self.metrics_report(parse_qs(url.query))
+        if route == ('GET', '/health'):
+            return 200, 'application/json', json.dumps({'status': 'ok', 'trained': self.engine.is_trained}).encode()
+        if url.path in ('/predict', '/generate', '/metrics', '/health'): raise HTTPError(405, "Method not allowed")
+        raise HTTPError(404, f"Unknown endpoint {url.path}")
+
+    # === HTTP/1.1 plumbing ===
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line: return None
+        try:
+            method, target, _ = line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {}
+        while True:
+            header = await reader.readline()
+            if header in (b'\r\n', b'\n', b''): break
+            name, _, value = header.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get('content-length', 0) or 0)
+        if length > MAX_BODY_BYTES: raise HTTPError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), target, headers, body
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                start = time.perf_counter()
+                endpoint = None
+                try:
+                    request = await self._read_request(reader)
+                    if request is None: break
+                    method, target, headers, body = request
+                    endpoint = urlsplit(target).path
+                    keep_alive = headers.get('connection', '').lower() != 'close'
+                    status, content_type, payload = await self.dispatch(method, target, headers, body)
+                except HTTPError as e:
+                    status, content_type = e.status, 'application/json'
+                    payload = json.dumps({'error': str(e)}).encode()
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    status, content_type = 500, 'application/json'
+                    payload = json.dumps({'error': f"{type(e).__name__}: {e}"}).encode()
+
+                head = (f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                        f"Content-Type: {content_type}\r\n"
+                        f"Content-Length: {len(payload)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+                writer.write(head.encode('latin-1') + payload)
+                await writer.drain()
+
+                if endpoint in ('/predict', '/generate'):
+                    self.stats[endpoint].record(time.perf_counter() - start, ok=status < 400)
+                if not keep_alive: break
+        finally:
+            writer.close()
+
+
+async def _serve(args):
+    engine = ModelEngine(args.data, n_workers=args.workers)
+    engine.initialize_system()
+    if not engine.is_trained:
+        print(f"[Server] {engine.load_error or 'Model is not trained and no training data was found.'}")
+        return 1
+    # Load everything up front so the first request does not pay for it
+    engine.load_models()
+    engine.prefill_synthesis()
+
+    server = InferenceServer(engine, n_workers=args.workers, max_batch=args.max_batch,
+                             max_wait=args.max_wait_ms / 1000.0)
+    port = await server.start(args.host, args.port)
+    print(f"[Server] Listening on http://{args.host}:{port}")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bio-Acoustic Translator HTTP inference service")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8000, help="0 picks a free port")
+    parser.add_argument('--workers', type=int, default=None, help="decode/feature processes (default: all cores)")
+    parser.add_argument('--max-batch', type=int, default=64, help="max /predict requests per classifier call")
+    parser.add_argument('--max-wait-ms', type=float, default=5.0, help="batching window after the first request")
+    parser.add_argument('--data', default="SoundsDatabase", help="training database folder")
+    args = parser.parse_args()
+
+    try:
+        return asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Sharded corpus scan across several processes or machines sharing the corpus filesystem.
+
+Usage:
+    python shard_scan.py scan --shard 3 --shards 8 [--data SoundsDatabase] [--out shards] [--workers 4]
+    python shard_scan.py merge [--out shards] [--data SoundsDatabase] [--train]
+    python shard_scan.py local --shards 4 [--data SoundsDatabase] [--out shards] [--workers 1] [--train]
+
+Files are assigned to shards by crc32 of their path relative to the corpus root, so every
+node computes the same split. Each `scan` writes a partial feature store (and keeps a
+per-shard feature cache next to it, so rescans are incremental); `merge` checks that all
+shards are present and assembles the training table, optionally training the model from
+it. `local` runs every shard as a separate local process, standing in for the nodes.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from feature_store import FeatureStore, shard_folder
+from instrumentation import metrics
+
+
+def _engine(args):
+    from model_engine import ModelEngine
+    return ModelEngine(args.data, n_workers=args.workers, f0_backend=args.f0_backend)
+
+
+def scan(args):
+    from feature_cache import FeatureCache
+    engine = _engine(args)
+    cache = None
+    if not args.no_cache:
+        cache_file = shard_folder(args.out, args.shard, args.shards) + ".cache.pkl"
+        cache = FeatureCache(cache_file, engine.dsp.feature_version).load()
+
+    start = time.perf_counter()
+    try:
+        store = engine.data_mgr.scan_shard(engine.dsp, args.shard, args.shards, args.out, cache=cache)
+    finally:
+        if cache is not None: cache.save()
+    print(f"[Shard {args.shard}/{args.shards}] {len(store)} rows, {len(engine.data_mgr.scan_errors)} failed, "
+          f"{time.perf_counter() - start:.1f}s -> {store.folder}")
+    return 0
+
+
+def merge(args):
+    if args.train:
+        engine = _engine(args)
+        template_db = engine.train_from_shards(args.out)
+        if template_db is None:
+            print("[Merge] The shard stores hold no rows; nothing to train.")
+            return 1
+        print(f"[Merge] Trained on {len(engine.feature_store)} rows, {len(template_db)} behaviors indexed.")
+        return 0
+
+    store = FeatureStore(args.merged or os.path.join(args.out, "merged"))
+    store.merge_shards(args.out, data_folder=args.data)
+    print(f"[Merge] {len(store)} rows from {store.meta['merged_from']['count']} shards -> {store.folder}")
+    return 0
+
+
+def local(args):
+    """
+    Run all shards as concurrent local processes (one per simulated node), then merge.
+    """
+    procs = []
+    for shard in range(args.shards):
+        cmd = [sys.executable, os.path.abspath(__file__), 'scan', '--shard', str(shard), '--shards', str(args.shards),
+               '--data', args.data, '--out', args.out, '--workers', str(args.workers or 1),
+               '--f0-backend', args.f0_backend]
+        if args.no_cache: cmd.append('--no-cache')
+        procs.append(subprocess.Popen(cmd))
+
+    failed = [shard for shard, proc in enumerate(procs) if proc.wait() != 0]
+    if failed:
+        print(f"[Local] Shards {failed} failed; not merging.")
+        return 1
+    return merge(args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded corpus scan and merge")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    def common(p):
+        p.add_argument('--data', default="SoundsDatabase", help="corpus root (as mounted on this node)")
+        p.add_argument('--out', default="shards", help="shared folder for the partial feature stores")
+        p.add_argument('--workers', type=int, default=None, help="feature processes on this node (default: all cores)")
+        p.add_argument('--f0-backend', default="yin", help="must match on every node (see DSPCore.F0_BACKENDS)")
+        p.add_argument('--metrics', default=None, help="record stage timings to this .json or .prom file")
+
+    p = sub.add_parser('scan', help="featurize one shard into a partial feature store")
+    common(p)
+    p.add_argument('--shard', type=int, required=True)
+    p.add_argument('--shards', type=int, required=True)
+    p.add_argument('--no-cache', action='store_true', help="do not keep a per-shard feature cache")
+
+    p = sub.add_parser('merge', help="assemble the shard stores into the training table")
+    common(p)
+    p.add_argument('--merged', default=None, help="merged store folder (default: <out>/merged)")
+    p.add_argument('--train', action='store_true', help="train the model (and its feature store) from the shards")
+
+    p = sub.add_parser('local', help="run every shard as a local process, then merge")
+    common(p)
+    p.add_argument('--shards', type=int, required=True)
+    p.add_argument('--no-cache', action='store_true')
+    p.add_argument('--merged', default=None)
+    p.add_argument('--train', action='store_true')
+
+    args = parser.parse_args()
+    if args.command == 'scan' and not 0 <= args.shard < args.shards:
+        parser.error("--shard must be in [0, --shards)")
+    if args.metrics: metrics.enable()
+
+    status = {'scan': scan, 'merge': merge, 'local': local}[args.command](args)
+    if args.metrics:
+        print(metrics.report())
+        metrics.write(args.metrics)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+import numpy as np
+
+# Pending inserts are merged into the inverted lists once they exceed this many rows
+# (or 5% of the index, whichever is larger)
+MERGE_MIN_ROWS = 4096
+
+
+def _assign(X, centroids, chunk=65536):
+    """
+    Index of the nearest centroid for every row of X, in chunks to bound memory.
+    """
+    c_norms = np.einsum('ij,ij->i', centroids, centroids)
+    labels = np.empty(len(X), dtype=np.int64)
+    for start in range(0, len(X), chunk):
+        # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2; ||x||^2 does not change the argmin
+        labels[start:start + chunk] = np.argmin(c_norms - 2.0 * (X[start:start + chunk] @ centroids.T), axis=1)
+    return labels
+
+
+def _kmeans(X, k, n_iter, rng):
+    """
+    Lloyd's k-means from k random rows. Empty clusters are re-seeded with random rows.
+    """
+    centroids = X[rng.choice(len(X), k, replace=False)].copy()
+    labels = None
+    for _ in range(n_iter):
+        new_labels = _assign(X, centroids)
+        if labels is not None and np.array_equal(new_labels, labels): break
+        labels = new_labels
+
+        counts = np.bincount(labels, minlength=k)
+        order = np.argsort(labels, kind='stable')
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        filled = counts > 0
+        centroids[filled] = np.add.reduceat(X[order], starts[filled]) / counts[filled, None]
+        empty = np.flatnonzero(~filled)
+        if len(empty): centroids[empty] = X[rng.choice(len(X), len(empty), replace=False)]
+    return centroids
+
+
+def _top_k(dists, k):
+    """
+    Positions of the k smallest distances, nearest first.
+    """
+    if len(dists) > k:
+        part = np.argpartition(dists, k - 1)[:k]
+        return part[np.argsort(dists[part], kind='stable')]
+    return np.argsort(dists, kind='stable')
+
+
+class SimilarityIndex:
+    """
+    Inverted-file (IVF) nearest-neighbour index over per-recording feature vectors.
+    Vectors are standardized per feature and stored as float32; k-means splits them into
+    n_lists cells, and a query only scans the rows of its n_probe nearest cells. Rows are
+    kept grouped by cell (CSR order: `offsets[c]:offsets[c + 1]`), so every probed cell
+    is one contiguous slice. Inserts go to a small pending buffer, which queries also scan,
+    and are merged into the cells in batches. search(exact=True) scans every row, for
+    validating the approximate results.
+    """
+
+    def __init__(self, n_probe=16):
+        self.n_probe = n_probe
+        self.mean = None
+        self.scale = None
+        self.centroids = None
+        # Standardized rows in cell order, their squared norms, paths and the cell offsets
+        self.vectors = None
+        self.norms = None
+        self.paths = None
+        self.offsets = None
+        self._clear_pending()
+
+    def __len__(self):
+        if self.vectors is None: return 0
+        return len(self.vectors) + len(self.pending_vectors)
+
+    @property
+    def n_lists(self):
+        return 0 if self.centroids is None else len(self.centroids)
+
+    def _clear_pending(self):
+        dim = 0 if self.centroids is None else self.centroids.shape[1]
+        self.pending_vectors = np.empty((0, dim), dtype=np.float32)
+        self.pending_lists = np.empty(0, dtype=np.int64)
+        self.pending_paths = np.empty(0, dtype=object)
+
+    def _standardize(self, vectors):
+        X = np.nan_to_num(np.asarray(vectors, dtype=np.float32))
+        return np.ascontiguousarray((X - self.mean) / self.scale, dtype=np.float32)
+
+    def build(self, vectors, paths, n_lists=None, n_iter=20, sample_per_list=64, seed=0):
+        """
+        Index `vectors` (n, n_features) labelled by `paths`. By default n_lists is about
+        sqrt(n); the cells are trained on at most sample_per_list rows per cell.
+        """
+        X = np.nan_to_num(np.asarray(vectors, dtype=np.float32))
+        if len(X) == 0: raise ValueError("Cannot build a similarity index from no vectors.")
+        self.mean = X.mean(axis=0)
+        std = X.std(axis=0)
+        self.scale = np.where(std > 1e-12, std, 1.0).astype(np.float32)
+        X = self._standardize(X)
+
+        if n_lists is None: n_lists = int(np.sqrt(len(X)))
+        n_lists = int(np.clip(n_lists, 1, len(X)))
+        rng = np.random.default_rng(seed)
+        sample = X if len(X) <= n_lists * sample_per_list else \
+            X[rng.choice(len(X), n_lists * sample_per_list, replace=False)]
+        self.centroids = _kmeans(sample, n_lists, n_iter, rng)
+
+        self.vectors = np.empty((0, X.shape[1]), dtype=np.float32)
+        self.norms = np.empty(0, dtype=np.float32)
+        self.paths = np.empty(0, dtype=object)
+        self.offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        self._clear_pending()
+        self._merge(X, _assign(X, self.centroids), np.asarray(paths, dtype=object))
+        return self
+
+    def _merge(self, X, lists, paths):
+        """
+        Merge rows into the cell-ordered arrays (one stable sort of all cell labels).
+        """
+        counts = np.diff(self.offsets)
+        all_lists = np.concatenate([np.repeat(np.arange(self.n_lists), counts), lists])
+        order = np.argsort(all_lists, kind='stable')
+
+        self.vectors = np.concatenate([self.vectors, X])[order]
+        self.norms = np.einsum('ij,ij->i', self.vectors, self.vectors)
+        self.paths = np.concatenate([self.paths, paths])[order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(all_lists, minlength=self.n_lists))])
+
+    def _drop(self, paths):
+        """
+        Remove the indexed rows (merged and pending) whose path is in the set `paths`.
+        """
+        keep = np.fromiter((p not in paths for p in self.paths), dtype=bool, count=len(self.paths))
+        if not keep.all():
+            lists = np.repeat(np.arange(self.n_lists), np.diff(self.offsets))[keep]
+            self.vectors, self.norms, self.paths = self.vectors[keep], self.norms[keep], self.paths[keep]
+            self.offsets = np.concatenate([[0], np.cumsum(np.bincount(lists, minlength=self.n_lists))])
+
+        keep = np.fromiter((p not in paths for p in self.pending_paths), dtype=bool, count=len(self.pending_paths))
+        if not keep.all():
+            self.pending_vectors = self.pending_vectors[keep]
+            self.pending_lists = self.pending_lists[keep]
+            self.pending_paths = self.pending_paths[keep]
+
+    def add(self, vectors, paths):
+        """
+        Insert recordings into an existing index; rows whose path is already indexed
+        replace the old entry. The cells and standardization are not retrained; rebuild
+        when the corpus has drifted far from the indexed one.
+        """
+        if self.centroids is None: return self.build(vectors, paths)
+        paths = np.asarray(paths, dtype=object)
+        # Within one batch the last row for a path wins
+        last = {p: i for i, p in enumerate(paths)}
+        rows = np.fromiter(last.values(), dtype=np.int64, count=len(last))
+        X, paths = self._standardize(np.asarray(vectors)[rows]), paths[rows]
+
+        self._drop(last)
+        self.pending_vectors = np.concatenate([self.pending_vectors, X])
+        self.pending_lists = np.concatenate([self.pending_lists, _assign(X, self.centroids)])
+        self.pending_paths = np.concatenate([self.pending_paths, paths])
+
+        if len(self.pending_vectors) >= max(MERGE_MIN_ROWS, len(self.vectors) // 20):
+            self._merge(self.pending_vectors, self.pending_lists, self.pending_paths)
+            self._clear_pending()
+        return self
+
+    def in_memory(self):
+        """
+        Replace memory-mapped arrays (an index loaded with joblib mmap_mode) by in-memory
+        copies, releasing the maps so the index file can be rewritten.
+        """
+        for name, value in list(vars(self).items()):
+            if isinstance(value, np.memmap): setattr(self, name, np.array(value))
+        return self
+
+    def _candidates(self, cells):
+        """
+        Row slices of the given cells (all rows for None) plus the matching pending rows,
+        as (vectors, norms, paths) arrays.
+        """
+        if cells is None and not len(self.pending_vectors): return self.vectors, self.norms, self.paths
+        parts = [slice(None)] if cells is None else [slice(self.offsets[c], self.offsets[c + 1]) for c in cells]
+        vectors = [self.vectors[s] for s in parts]
+        norms = [self.norms[s] for s in parts]
+        paths = [self.paths[s] for s in parts]
+
+        if len(self.pending_vectors):
+            mask = slice(None) if cells is None else np.isin(self.pending_lists, cells)
+            pending = self.pending_vectors[mask]
+            vectors.append(pending)
+            norms.append(np.einsum('ij,ij->i', pending, pending))
+            paths.append(self.pending_paths[mask])
+        return np.concatenate(vectors), np.concatenate(norms), np.concatenate(paths)
+
+    def search(self, query, k=20, n_probe=None, exact=False):
+        """
+        k nearest indexed recordings to each query vector (unstandardized, like the input
+        of build). Returns a list with one [(path, distance), ...] list per query, nearest
+        first; a single 1-D query returns just its list.
+        """
+        if self.centroids is None: raise ValueError("The similarity index is empty.")
+        single = np.ndim(query) == 1
+        Q = self._standardize(np.atleast_2d(query))
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+
+        cells = None
+        if not exact:
+            c_norms = np.einsum('ij,ij->i', self.centroids, self.centroids)
+            coarse = c_norms - 2.0 * (Q @ self.centroids.T)
+
+        results = []
+        for i, q in enumerate(Q):
+            if not exact: cells = np.sort(np.argpartition(coarse[i], n_probe - 1)[:n_probe])
+            vectors, norms, paths = self._candidates(cells)
+            dists = np.maximum(norms - 2.0 * (vectors @ q) + q @ q, 0.0)
+            best = _top_k(dists, k)
+            # The norm expansion loses precision for near-duplicates; recompute the k winners directly
+            exact_dists = np.linalg.norm(vectors[best] - q, axis=1)
+            results.append([(paths[j], float(d)) for j, d in zip(best, exact_dists)])
+        return results[0] if single else results
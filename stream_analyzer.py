@@ -0,0 +1,213 @@
+"""
+Streaming / real-time classification for live input and very long recordings.
+
+Usage:
+    python stream_analyzer.py                 # live microphone
+    python stream_analyzer.py barn_night.wav  # long recording, read block by block
+"""
+import sys
+import time
+import queue
+import collections
+import numpy as np
+import librosa
+from audio_io import resample
+
+
+class CallSegmenter:
+    """
+    Onset/energy-based call segmentation over a stream of audio blocks.
+    An adaptive noise floor is tracked between calls; a call opens when the frame energy
+    rises `threshold_db` above it and closes after `hangover` seconds below `release_db`
+    (or once it reaches `max_call` seconds). Memory is bounded by `max_call`.
+    """
+
+    def __init__(self, sr, threshold_db=15.0, release_db=10.0, hangover=0.15,
+                 min_call=0.05, max_call=5.0, pre_roll=0.05, frame_duration=0.023):
+        self.sr = sr
+        self.hop = max(1, int(sr * frame_duration))
+        self.threshold_db = threshold_db
+        self.release_db = release_db
+        self.hangover_frames = max(1, int(hangover * sr / self.hop))
+        self.min_call_frames = max(1, int(min_call * sr / self.hop))
+        self.max_call_frames = max(1, int(max_call * sr / self.hop))
+
+        self._pre = collections.deque(maxlen=max(1, int(pre_roll * sr / self.hop)))
+        self._carry = np.zeros(0, dtype=np.float32)
+        self._floor_db = None
+        self._pos = 0
+        self._call = None
+        self._call_start = 0
+        self._silent = 0
+
+    def process(self, block):
+        """
+        Feed one block of mono samples. Returns a list of (start_sample, segment)
+        for every call that ended within this block.
+        """
+        y = np.concatenate([self._carry, np.asarray(block, dtype=np.float32)])
+        n_frames = len(y) // self.hop
+        self._carry = y[n_frames * self.hop:]
+
+        frames = y[:n_frames * self.hop].reshape(n_frames, self.hop)
+        energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-12)
+
+        calls = []
+        for frame, db in zip(frames, energy_db):
+            call = self._step(frame, db)
+            if call: calls.append(call)
+        return calls
+
+    def flush(self):
+        """
+        Close the call in progress at the end of the stream.
+        """
+        return [call for call in [self._close()] if call]
+
+    def _step(self, frame, db):
+        call = None
+        if self._floor_db is None: self._floor_db = db
+
+        if self._call is None:
+            if db > self._floor_db + self.threshold_db:
+                # Onset: start the call with the pre-roll so the attack is not clipped
+                self._call = list(self._pre) + [frame]
+                self._call_start = self._pos - len(self._pre) * self.hop
+                self._silent = 0
+                self._pre.clear()
+            else:
+                # Follow falling noise immediately, rising noise slowly
+                if db < self._floor_db:
+                    self._floor_db = db
+                else:
+                    self._floor_db += 0.02 * (db - self._floor_db)
+                self._pre.append(frame)
+        else:
+            self._call.append(frame)
+            self._silent = self._silent + 1 if db < self._floor_db + self.release_db else 0
+            if self._silent >= self.hangover_frames or len(self._call) >= self.max_call_frames:
+                call = self._close()
+
+        self._pos += self.hop
+        return call
+
+    def _close(self):
+        if self._call is None: return None
+        frames, start = self._call, self._call_start
+        self._call = None
+
+        if len(frames) - self._silent < self.min_call_frames: return None
+        return start, np.concatenate(frames)
+
+
+class StreamAnalyzer:
+    """
+    Incremental Species/Context/Emotion classification of an audio stream.
+    Each call found by the CallSegmenter is featurized and classified as soon as it
+    ends, producing a timestamped event dict.
+    """
+
+    def __init__(self, engine, sr=None, **segmenter_args):
+        self.engine = engine
+        self.sr = sr or engine.dsp.sr
+        self.segmenter = CallSegmenter(self.sr, **segmenter_args)
+
+    def process_block(self, block):
+        events = []
+        for start, segment in self.segmenter.process(block):
+            event = self._classify(start, segment)
+            if event: events.append(event)
+        return events
+
+    def flush(self):
+        events = []
+        for start, segment in self.segmenter.flush():
+            event = self._classify(start, segment)
+            if event: events.append(event)
+        return events
+
+    def _classify(self, start, segment):
+        t0 = time.perf_counter()
+        end = start + len(segment)
+        # Same polyphase resampling as the decoder of the training corpus (AudioReader)
+        if self.sr != self.engine.dsp.sr: segment = resample(segment, self.sr, self.engine.dsp.sr)
+
+        feats = self.engine.dsp.extract_features(segment, self.engine.dsp.sr)
+        if not feats: return None
+
+        species, context, emotion = self.engine.classify_features([feats])
+        return {
+            'Start': start / self.sr,
+            'End': end / self.sr,
+            'Species': species[0],
+            'Context': context[0],
+            'Emotion': emotion[0],
+            'Features': feats,
+            # Processing time after the call closed (the segmenter adds `hangover` on top)
+            'Latency': time.perf_counter() - t0
+        }
+
+    def analyze_file(self, filepath, block_duration=1.0):
+        """
+        Classify a recording of any length, reading it block by block at its native rate.
+        Yields events in time order.
+        """
+        frame = self.segmenter.hop
+        blocks = librosa.stream(filepath, block_length=max(1, int(block_duration * self.sr / frame)),
+                                frame_length=frame, hop_length=frame, mono=True, fill_value=0)
+        for block in blocks:
+            yield from self.process_block(block)
+        yield from self.flush()
+
+    def listen(self, block_duration=0.1, device=None, stop_event=None):
+        """
+        Classify live microphone input until stop_event is set (or KeyboardInterrupt).
+        Yields events as calls end.
+        """
+        import sounddevice as sd
+
+        blocks = queue.Queue()
+
+        def callback(indata, frames, time_info, status):
+            blocks.put(indata[:, 0].copy())
+
+        with sd.InputStream(samplerate=self.sr, channels=1, blocksize=int(block_duration * self.sr),
+                            device=device, dtype='float32', callback=callback):
+            try:
+                while stop_event is None or not stop_event.is_set():
+                    try:
+                        block = blocks.get(timeout=0.5)
+                    except queue.Empty:
+                        continue
+                    yield from self.process_block(block)
+            except KeyboardInterrupt:
+                pass
+        yield from self.flush()
+
+
+def main():
+    from model_engine import ModelEngine
+
+    engine = ModelEngine()
+    engine.initialize_system()
+    if not engine.is_trained:
+        print(f"[Stream] {engine.load_error or 'Model is not trained and no training data was found.'}")
+        return 1
+
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+        analyzer = StreamAnalyzer(engine, sr=librosa.get_samplerate(path))
+        events = analyzer.analyze_file(path)
+    else:
+        print("[Stream] Listening... press Ctrl+C to stop.")
+        analyzer = StreamAnalyzer(engine)
+        events = analyzer.listen()
+
+    for ev in events:
+        print(f"[{ev['Start']:9.2f}s - {ev['End']:9.2f}s] {ev['Species']:<9} | {ev['Context']:<20} | "
+              f"{ev['Emotion']:<9} | {ev['Latency'] * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from instrumentation import metrics
+
+
+class SynthesisPool:
+    """
+    Pre-rendered variant pool for instant synthesis.
+    Decoded templates are kept in an LRU-bounded cache, and background workers keep
+    `pool_size` random variants ready per (Species, Context), refilling the pool as
+    variants are taken. A Generate request is then a constant-time pop; only an empty
+    pool falls back to rendering synchronously.
+    """
+
+    def __init__(self, dsp, template_db, pool_size=3, cache_size=32, n_workers=2):
+        self.dsp = dsp
+        self.template_db = template_db
+        self.pool_size = pool_size
+        self.cache_size = cache_size
+
+        self._templates = OrderedDict()
+        self._pools = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="synth")
+
+    def _template(self, key):
+        with self._lock:
+            if key in self._templates:
+                self._templates.move_to_end(key)
+                return self._templates[key]
+
+        # Decode outside the lock; a concurrent duplicate load is harmless
+        y = self.dsp.load_template(self.template_db[key])
+        with self._lock:
+            self._templates[key] = y
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.cache_size:
+                self._templates.popitem(last=False)
+        return y
+
+    def _render(self, key, n_variants):
+        # All missing variants of one key are rendered together from one shared STFT
+        try:
+            y = self._template(key)
+            with metrics.stage('synthesis.augment_batch'):
+                variants, lengths = self.dsp.augment_batch(y, n_variants)
+            with self._lock:
+                self._pools.setdefault(key, deque()).extend(v[:n].copy() for v, n in zip(variants, lengths))
+        except Exception as e:
+            print(f"[Synthesis Pool] Rendering {key} failed: {e}")
+            metrics.count('synthesis_errors', type(e).__name__)
+        finally:
+            with self._lock:
+                self._pending[key] -= n_variants
+
+    def _refill(self, key):
+        with self._lock:
+            missing = self.pool_size - len(self._pools.get(key, ())) - self._pending.get(key, 0)
+            if missing <= 0: return
+            self._pending[key] = self._pending.get(key, 0) + missing
+
+        self._executor.submit(self._render, key, missing)
+
+    def prefill(self, keys=None):
+        """
+        Queue background rendering for the given keys (default: every template).
+        """
+        for key in (keys if keys is not None else list(self.template_db)):
+            self._refill(key)
+
+    def get(self, key):
+        """
+        Return (audio, sr) for a fresh variant of the template for `key`,
+        or (None, None) if there is no template for it.
+        """
+        if key not in self.template_db: return None, None
+
+        with self._lock:
+            pool = self._pools.get(key)
+            variant = pool.popleft() if pool else None
+
+        if variant is None:
+            metrics.count('synthesis_pool_misses')
+            try:
+                variant = self.dsp.variate_signal(self._template(key))
+            except Exception as e:
+                print(f"[DSP Error] {e}")
+                metrics.count('synthesis_errors', type(e).__name__)
+                return self.dsp.silence()
+
+        self._refill(key)
+        return variant, self.dsp.sr
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,94 @@
+"""
+Synthetic labelled corpus for benchmarks and smoke tests.
+
+Usage:
+    python synthetic_corpus.py out_folder [--files 300] [--min-duration 0.5] [--max-duration 4.0] [--seed 0]
+
+Files are named ID-Species-Context-Emotion-ID.wav (see DataManager.parse_filename) and
+contain harmonic calls whose pitch, timbre and noise depend on the labels, so a classifier
+trained on them has something to learn.
+"""
+import argparse
+import os
+import numpy as np
+from scipy.io import wavfile
+
+# Label taxonomy used for synthetic benchmark data
+SPECIES = ["Goat", "Pig", "WildBoar"]
+CONTEXTS = ["Isolation", "Feeding", "Reunion", "Separation", "Handling"]
+EMOTIONS = ["Positive", "Negative"]
+
+# Base fundamental frequency per species (Hz)
+SPECIES_F0 = {"Goat": 320.0, "Pig": 180.0, "WildBoar": 110.0}
+
+
+def synthetic_call(sr, duration, f0, rng, n_harmonics=6, noise_level=0.05):
+    """
+    Harmonic animal-like call with a slight vibrato, an attack/decay envelope and
+    a broadband noise floor, padded with short silences on both sides.
+    """
+    n = int(sr * duration)
+    t = np.arange(n) / sr
+    vibrato = 1.0 + 0.02 * np.sin(2 * np.pi * rng.uniform(3, 7) * t)
+    phase = 2 * np.pi * np.cumsum(f0 * vibrato) / sr
+
+    y = np.zeros(n)
+    for h in range(1, n_harmonics + 1):
+        y += rng.uniform(0.3, 1.0) / h * np.sin(h * phase)
+
+    env = np.minimum(1.0, t / 0.05) * np.exp(-t * rng.uniform(0.5, 2.0))
+    y = y * env + noise_level * rng.standard_normal(n)
+
+    silence = np.zeros(int(0.2 * sr))
+    y = np.concatenate([silence, y, silence])
+    return (0.8 * y / np.max(np.abs(y))).astype(np.float32)
+
+
+def labelled_call(species, context, emotion, sr, duration, rng):
+    """
+    A synthetic call whose parameters depend on its labels: species sets the pitch,
+    context the pitch offset and number of harmonics, emotion the pitch and noise level.
+    """
+    ctx_idx = CONTEXTS.index(context)
+    positive = emotion == "Positive"
+    f0 = SPECIES_F0[species] * (1.0 + 0.08 * ctx_idx) * (1.1 if positive else 0.9) * rng.uniform(0.93, 1.07)
+    return synthetic_call(sr, duration, f0, rng, n_harmonics=3 + ctx_idx,
+                          noise_level=0.02 if positive else 0.08)
+
+
+def write_corpus(folder, n_files=300, min_duration=0.5, max_duration=4.0, sr=22050, seed=0):
+    """
+    Write n_files labelled 16-bit WAV calls of random length to `folder`.
+    Returns the list of written paths.
+    """
+    os.makedirs(folder, exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    paths = []
+    for i in range(n_files):
+        species = SPECIES[rng.integers(len(SPECIES))]
+        context = CONTEXTS[rng.integers(len(CONTEXTS))]
+        emotion = EMOTIONS[rng.integers(len(EMOTIONS))]
+        y = labelled_call(species, context, emotion, sr, rng.uniform(min_duration, max_duration), rng)
+
+        path = os.path.join(folder, f"{i:05d}-{species}-{context}-{emotion}-{i % 100:02d}.wav")
+        wavfile.write(path, sr, (y * 32767).astype(np.int16))
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic labelled call corpus")
+    parser.add_argument('folder')
+    parser.add_argument('--files', type=int, default=300)
+    parser.add_argument('--min-duration', type=float, default=0.5)
+    parser.add_argument('--max-duration', type=float, default=4.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    paths = write_corpus(args.folder, args.files, args.min_duration, args.max_duration, seed=args.seed)
+    print(f"[Corpus] Wrote {len(paths)} files to {args.folder}")
+
+
+if __name__ == "__main__":
+    main()
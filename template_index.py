@@ -0,0 +1,165 @@
+import os
+import zlib
+import numpy as np
+import pandas as pd
+import joblib
+
+
+class TemplateIndex:
+    """
+    Persistent per-(Species, Context) index of synthesis template candidates.
+    Each group keeps its recordings sorted by spectral centroid together with their F0
+    and full feature vectors, so Semantic Hash Anchoring and "templates nearest to a target
+    centroid/F0" queries need neither a rescan nor a re-sort of the whole corpus table.
+    """
+
+    def __init__(self, index_file="template_index.pkl"):
+        self.index_file = index_file
+        self.feature_cols = []
+        # key -> {'paths': object array, 'centroid': sorted float array, 'f0': float array,
+        #         'features': (n, n_features) float32 array}, all in centroid order
+        self.groups = {}
+        # key -> (crc32 of the paths, crc32 of the features), both in feature table order
+        self.digests = {}
+
+    def load(self):
+        self.groups, self.digests = {}, {}
+        if os.path.exists(self.index_file):
+            try:
+                payload = joblib.load(self.index_file)
+                self.feature_cols = payload['feature_cols']
+                self.groups = payload['groups']
+                # Indexes saved without digests are rebuilt group by group on the next sync
+                self.digests = payload.get('digests', {})
+            except Exception as e:
+                print(f"[Template Index] Ignoring unreadable index ({e}).")
+        return self
+
+    def save(self):
+        tmp_file = self.index_file + ".tmp"
+        joblib.dump({'feature_cols': self.feature_cols, 'groups': self.groups, 'digests': self.digests}, tmp_file)
+        os.replace(tmp_file, self.index_file)
+
+    def _build_group(self, group):
+        order = np.argsort(group['centroid_mean'].values, kind='stable')
+        return {
+            'paths': group['Filepath'].values[order].astype(object),
+            'centroid': group['centroid_mean'].values[order].astype(np.float64),
+            'f0': group['f0_mean'].values[order].astype(np.float64),
+            'features': group[self.feature_cols].values[order].astype(np.float32)
+        }
+
+    @staticmethod
+    def _only_changed(old, paths, fresh):
+        """
+        True if a group differs from its indexed version only by the `fresh` rows: no
+        indexed recording vanished and every other row is already indexed.
+        """
+        known = pd.Index(paths).isin(old['paths'])
+        return bool(np.all(known | fresh)) and int(known.sum()) == len(old['paths'])
+
+    def sync(self, df, feature_cols, changed=None):
+        """
+        Bring the index in line with a feature table: unchanged groups are kept as-is,
+        changed groups are updated and vanished groups dropped. A group is unchanged if
+        the digest of its paths matches and, given `changed` (the paths featurized since
+        the last sync, e.g. DataManager.scan_changed), none of its rows is in it; without
+        `changed`, its feature digest must match too. A group that only gained or
+        re-featurized rows of `changed` is updated through add(); others are rebuilt.
+        Returns the number of updated groups.
+        """
+        if list(feature_cols) != self.feature_cols:
+            self.feature_cols = list(feature_cols)
+            self.groups, self.digests = {}, {}
+
+        # Work on row positions; group frames are only materialized for groups that changed
+        paths = df['Filepath'].to_numpy(dtype=object)
+        fresh = None if changed is None else df['Filepath'].isin(list(changed)).to_numpy()
+        features = None
+
+        def feature_digest(rows):
+            nonlocal features
+            if features is None: features = np.ascontiguousarray(df[self.feature_cols].to_numpy(dtype=np.float32))
+            return zlib.crc32(features[rows])
+
+        updated, seen, inserts = 0, set(), []
+        for key, rows in df.groupby(['Species', 'Context'], observed=True).indices.items():
+            seen.add(key)
+            old, old_digest = self.groups.get(key), self.digests.get(key, (None, None))
+            path_digest = zlib.crc32('\0'.join(paths[rows]).encode('utf-8'))
+
+            if old is not None and path_digest == old_digest[0]:
+                if fresh is not None and not fresh[rows].any(): continue
+                if fresh is None and feature_digest(rows) == old_digest[1]: continue
+
+            if old is not None and fresh is not None and self._only_changed(old, paths[rows], fresh[rows]):
+                inserts.append(rows[fresh[rows]])
+            else:
+                self.groups[key] = self._build_group(df.iloc[rows])
+            self.digests[key] = (path_digest, feature_digest(rows))
+            updated += 1
+        if inserts: self.add(df.iloc[np.concatenate(inserts)])
+
+        for key in [k for k in self.groups if k not in seen]:
+            del self.groups[key]
+            self.digests.pop(key, None)
+        return updated
+
+    def add(self, df):
+        """
+        Insert new recordings; rows whose Filepath is already indexed replace the old entry.
+        """
+        for key, group in df.groupby(['Species', 'Context'], observed=True):
+            new = self._build_group(group)
+            old = self.groups.get(key)
+            if old is not None:
+                keep = ~pd.Index(old['paths']).isin(new['paths'])
+                kept = old if keep.all() else {name: values[keep] for name, values in old.items()}
+                # Both are centroid-sorted: insert the new rows in place instead of re-sorting
+                at = np.searchsorted(kept['centroid'], new['centroid'], side='right')
+                new = {name: np.insert(kept[name], at, new[name], axis=0) for name in new}
+            self.groups[key] = new
+
+    def anchor(self, key):
+        """
+        Semantic Hash Anchoring: the recording at the context-hashed position of the
+        centroid-sorted group, giving a deterministic yet context-specific template.
+        """
+        group = self.groups.get(key)
+        if group is None: return None
+        paths = group['paths']
+        if len(paths) == 1: return paths[0]
+
+        # Map context string to a percentage (0-99)
+        hash_val = zlib.crc32(str(key[1]).encode('utf-8')) % 100
+        return paths[int((hash_val / 100.0) * (len(paths) - 1))]
+
+    def anchors(self):
+        return {key: self.anchor(key) for key in self.groups}
+
+    def nearest(self, key, centroid=None, f0=None, k=5):
+        """
+        The k recordings of a group closest to a target centroid and/or F0.
+        Centroid-only queries search a window of the sorted array; combined queries use
+        distances scaled by each group's spread. Without a target, the anchor's neighbours.
+        """
+        group = self.groups.get(key)
+        if group is None: return []
+        cents, n = group['centroid'], len(group['paths'])
+        k = min(k, n)
+
+        if centroid is None and f0 is None:
+            anchor = self.anchor(key)
+            centroid = cents[list(group['paths']).index(anchor)]
+
+        if f0 is None:
+            pos = np.searchsorted(cents, centroid)
+            candidates = np.arange(max(0, pos - k), min(n, pos + k))
+            best = candidates[np.argsort(np.abs(cents[candidates] - centroid), kind='stable')[:k]]
+        else:
+            dist = np.zeros(n)
+            if centroid is not None: dist += ((cents - centroid) / (np.std(cents) or 1.0)) ** 2
+            dist += ((group['f0'] - f0) / (np.std(group['f0']) or 1.0)) ** 2
+            best = np.argsort(dist, kind='stable')[:k]
+
+        return [group['paths'][i] for i in best]
@@ -0,0 +1,67 @@
+import asyncio
+import json
+import os
+import sys
+import numpy as np
+import pytest
+import soundfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dsp_core import DSPCore
+from server import HTTPError, InferenceServer
+from synthetic_corpus import synthetic_call
+
+
+class _Engine:
+    """
+    Just enough of a ModelEngine for /predict: the DSP configuration and a classifier.
+    """
+
+    def __init__(self):
+        self.dsp = DSPCore()
+        self.is_trained = True
+
+    def classify_features(self, feats):
+        n = len(feats)
+        return ['Goat'] * n, ['Isolation'] * n, ['Negative'] * n
+
+
+def _predict(server, body, headers):
+    status, _, payload = asyncio.run(_run(server, body, headers))
+    assert status == 200
+    return json.loads(payload)
+
+
+async def _run(server, body, headers):
+    await server.start(port=0)
+    try:
+        return await server.predict(body, headers)
+    finally:
+        await server.close()
+
+
+def test_predict_bytes_matches_path(tmp_path):
+    # A stereo recording at 44.1 kHz, so both routes have to downmix and resample
+    sr = 44100
+    y = synthetic_call(sr, 1.5, 220.0, np.random.default_rng(0))
+    path = str(tmp_path / "0001-Goat-Isolation-Negative-01.wav")
+    soundfile.write(path, np.column_stack([y, 0.5 * y]), sr, subtype='PCM_16')
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    by_path = _predict(InferenceServer(_Engine(), n_workers=1), json.dumps({'path': path}).encode(),
+                       {'content-type': 'application/json'})
+    by_bytes = _predict(InferenceServer(_Engine(), n_workers=1), data, {'content-type': 'audio/wav'})
+
+    assert by_bytes['Features'] == by_path['Features']
+    assert by_bytes['Species'] == by_path['Species'] == 'Goat'
+
+
+@pytest.mark.parametrize('body', [{'species': ['Goat'], 'context': 'Isolation'},
+                                  {'species': 'Goat', 'context': {'name': 'Isolation'}}])
+def test_generate_rejects_non_string_params(body):
+    server = InferenceServer(_Engine(), n_workers=1)
+    with pytest.raises(HTTPError) as err:
+        asyncio.run(server.generate(json.dumps(body).encode(), {}))
+    assert err.value.status == 400